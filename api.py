@@ -0,0 +1,278 @@
+import itertools
+import os
+import shutil
+import tempfile
+from datetime import date
+
+from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+import services
+from bulk_io import EXPORT_COLUMNS, export_columns, export_records, iter_csv_chunks
+from data_store import DataConflictError, DataStore
+from history_archive import retention_days_from_env
+from identifiers import CLIENT_ID, GAME_ID
+from inventory import copy_counts
+from metrics import metrics, span
+from overdue import OverdueMonitor, sink_from_env
+from services import NotFoundError, ServiceError
+from storage import open_storage
+
+# Komentarz: Bezgłowe API HTTP dla kas (POS/Subiekt) i czytników kodów kreskowych.
+# Korzysta z tego samego magazynu co aplikacja Streamlit (zmiany z obu stron
+# są widoczne dzięki znacznikom wersji) i z tych samych operacji z `services`.
+# Zapisy (fsync) wykonywane są w puli wątków, żeby nie blokować pętli zdarzeń.
+#
+# Uruchomienie: uvicorn api:app --port 8000   (backend jak w aplikacji: BORROW_APP_STORAGE)
+
+STORAGE_BACKEND = os.environ.get('BORROW_APP_STORAGE', 'sqlite')
+SEARCH_LIMIT = 50
+
+data_store = DataStore(open_storage(STORAGE_BACKEND), retention_days=retention_days_from_env())
+overdue_monitor = OverdueMonitor(data_store, sink=sink_from_env())
+
+
+def error(status_code, message):
+    return JSONResponse({'error': message}, status_code=status_code)
+
+
+def _parse_date(value, field):
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ServiceError(f"Pole '{field}' musi być datą w formacie RRRR-MM-DD.")
+
+
+def _parse_count(value, field):
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        raise ServiceError(f"Pole '{field}' musi być nieujemną liczbą całkowitą.")
+    return value
+
+
+def _parse_text(values, field):
+    """Wartość pola tekstowego albo None, gdy pola brak lub jest puste."""
+    value = values.get(field)
+    if value is None or value == '':
+        return None
+    if not isinstance(value, str):
+        raise ServiceError(f"Pole '{field}' musi być tekstem.")
+    return value
+
+
+def _resolve_client(values):
+    """ID klienta wskazanego przez 'client_id', numer telefonu ('phone') albo etykietę 'Imię Nazwisko (Telefon)' ('client')."""
+    client_id = _parse_text(values, 'client_id')
+    phone = _parse_text(values, 'phone')
+    label = _parse_text(values, 'client')
+    if client_id:
+        client = data_store.find_client(client_id)
+    elif phone:
+        client = data_store.find_client_by_phone(phone)
+    elif label:
+        client = data_store.find_client_by_label(label)
+    else:
+        raise ServiceError("Podaj klienta ('client_id', 'phone' lub 'client').")
+    if client is None:
+        raise NotFoundError("Nieznany klient.")
+    return client[CLIENT_ID]
+
+
+async def _json_body(request):
+    try:
+        body = await request.json()
+    except ValueError:
+        raise ServiceError("Niepoprawny JSON.")
+    if not isinstance(body, dict):
+        raise ServiceError("Oczekiwano obiektu JSON.")
+    return body
+
+
+def handle_errors(endpoint):
+    """Zamienia wyjątki usług na odpowiedzi HTTP: 400 (dane), 404 (brak), 409 (konflikt)."""
+    async def wrapper(request):
+        try:
+            with span(f"api.{endpoint.__name__}"):
+                # Zmiany zapisane przez inne procesy (np. aplikację Streamlit); odczyt znaczników
+                # czeka na trwający zapis, więc nie może blokować pętli zdarzeń
+                await run_in_threadpool(data_store.refresh)
+                return await endpoint(request)
+        except DataConflictError as e:
+            return error(409, str(e))
+        except NotFoundError as e:
+            return error(404, str(e))
+        except ServiceError as e:
+            return error(400, str(e))
+    return wrapper
+
+
+def _game_row(game):
+    free, total = copy_counts(game)
+    return {'Nazwa Gry': game['Nazwa Gry'], 'Wolne egzemplarze': free, 'Wszystkie egzemplarze': total}
+
+
+# --- Odczyt ---
+@handle_errors
+async def health(request):
+    return JSONResponse({'status': 'ok', 'version': data_store.version})
+
+
+@handle_errors
+async def list_games(request):
+    """GET /games?q=...&available=1 - gry z liczbą wolnych egzemplarzy."""
+    query = request.query_params.get('q', '')
+    only_available = request.query_params.get('available') in ('1', 'true')
+    games = data_store.games
+    # Najpierw filtr dostępności, potem limit - jak w search_available_games
+    candidates = (games[position] for position in data_store.search_games(query)) if query else iter(games)
+    if only_available:
+        candidates = (game for game in candidates if game.get('Dostępna', True))
+    return JSONResponse([_game_row(game) for game in itertools.islice(candidates, SEARCH_LIMIT)])
+
+
+@handle_errors
+async def get_game(request):
+    game = data_store.find_game(request.path_params['title'])
+    if game is None:
+        raise NotFoundError(f"Nieznana gra: {request.path_params['title']}")
+    return JSONResponse(dict(_game_row(game), **{'Egzemplarze': game['Egzemplarze']}))
+
+
+@handle_errors
+async def get_copy(request):
+    """GET /copies/{copy_id} - stan egzemplarza po zeskanowaniu kodu kreskowego."""
+    copy_id = request.path_params['copy_id']
+    game = data_store.game_for_copy(copy_id)
+    if game is None:
+        raise NotFoundError(f"Nieznany egzemplarz: {copy_id}")
+    return JSONResponse({
+        'Egzemplarz': copy_id,
+        GAME_ID: game[GAME_ID],
+        'Tytuł Gry': game['Nazwa Gry'],
+        'Wypożyczenie': data_store.index.rental_by_copy.get(copy_id),
+    })
+
+
+@handle_errors
+async def list_rentals(request):
+    """GET /rentals?client_id=...|phone=...|client=... - aktywne wypożyczenia (wszystkie albo jednego klienta)."""
+    params = request.query_params
+    if any(params.get(key) for key in ('client_id', 'phone', 'client')):
+        return JSONResponse(data_store.rentals_for_client(_resolve_client(params)))
+    return JSONResponse(data_store.rented_games())
+
+
+@handle_errors
+async def client_history(request):
+    """GET /clients/{client_id}/history - historia wypożyczeń i zwrotów klienta (z indeksu historii)."""
+    client_id = request.path_params['client_id']
+    if data_store.find_client(client_id) is None:
+        raise NotFoundError(f"Nieznany klient: {client_id}")
+    return JSONResponse(data_store.client_history(client_id))
+
+
+@handle_errors
+async def list_overdue(request):
+    await run_in_threadpool(overdue_monitor.scan)
+    return JSONResponse(overdue_monitor.rows())
+
+
+@handle_errors
+async def export_collection(request):
+    """GET /export/{collection}?format=csv|parquet - eksport kolekcji (historia razem z archiwum).
+
+    CSV jest wysyłany strumieniowo, partiami, bez budowania pliku. Parquet zapisywany jest partiami
+    do pliku tymczasowego i wysyłany kawałkami; plik jest usuwany po wysłaniu.
+    """
+    collection = request.path_params['collection']
+    if collection not in EXPORT_COLUMNS:
+        raise NotFoundError(f"Nieznana kolekcja: {collection}")
+    file_format = request.query_params.get('format', 'csv')
+    if file_format not in ('csv', 'parquet'):
+        raise ServiceError("Pole 'format' musi mieć wartość 'csv' lub 'parquet'.")
+    file_name = f"{collection}.{file_format}"
+    records = iter(data_store.export_source(collection))
+    if file_format == 'csv':
+        # Pierwszy rekord (także z archiwum) wyznacza kolumny - odczyt z dysku poza pętlą zdarzeń
+        first = await run_in_threadpool(next, records, None)
+        chunks = iter_csv_chunks(itertools.chain([first] if first is not None else [], records), export_columns(collection, first))
+        headers = {'Content-Disposition': f'attachment; filename="{file_name}"'}
+        return StreamingResponse((chunk.encode('utf-8') for chunk in chunks), media_type='text/csv; charset=utf-8', headers=headers)
+    export_dir = tempfile.mkdtemp(prefix='borrow_app_export_')
+    export_path = os.path.join(export_dir, file_name)
+    try:
+        await run_in_threadpool(export_records, collection, records, export_path)
+    except BaseException:
+        shutil.rmtree(export_dir, ignore_errors=True)
+        raise
+    return FileResponse(export_path, filename=file_name, media_type='application/vnd.apache.parquet',
+                        background=BackgroundTask(shutil.rmtree, export_dir, ignore_errors=True))
+
+
+# --- Zapis ---
+@handle_errors
+async def create_rental(request):
+    """POST /rentals {client_id|phone|client, title|copy_id, date_to, [date_from], [cost_per_day], [days]}."""
+    body = await _json_body(request)
+    copy_id = _parse_text(body, 'copy_id')
+    title = _parse_text(body, 'title')
+    client_id = _resolve_client(body)
+    start_date = _parse_date(body['date_from'], 'date_from') if body.get('date_from') else services.warsaw_today()
+    end_date = _parse_date(body.get('date_to'), 'date_to')
+    cost_per_day = _parse_count(body.get('cost_per_day'), 'cost_per_day')
+    options = {
+        'cost_per_day': services.DEFAULT_DAILY_COST if cost_per_day is None else cost_per_day,
+        'days': _parse_count(body.get('days'), 'days'),
+    }
+    if copy_id:
+        rental = await run_in_threadpool(services.rent_copy, data_store, client_id, copy_id, start_date, end_date, **options)
+    elif title:
+        rental = await run_in_threadpool(services.rent_game, data_store, client_id, title, start_date, end_date, **options)
+    else:
+        raise ServiceError("Podaj grę ('title' lub 'copy_id').")
+    return JSONResponse(rental, status_code=201)
+
+
+@handle_errors
+async def create_return(request):
+    """POST /returns {copy_id, [return_date] | [days_late]} - zwrot z wyliczoną opłatą za zwłokę."""
+    body = await _json_body(request)
+    copy_id = _parse_text(body, 'copy_id')
+    if not copy_id:
+        raise ServiceError("Podaj egzemplarz ('copy_id').")
+    return_date = _parse_date(body['return_date'], 'return_date') if body.get('return_date') else None
+    late_days = _parse_count(body.get('days_late'), 'days_late')
+    result = await run_in_threadpool(services.return_copy, data_store, copy_id, return_date, late_days)
+    return JSONResponse(result)
+
+
+async def prometheus_metrics(request):
+    """GET /metrics - czasy obsługi żądań i zapisów w formacie Prometheusa."""
+    return PlainTextResponse(metrics.prometheus_text(), media_type='text/plain; version=0.0.4')
+
+
+routes = [
+    Route('/health', health),
+    Route('/metrics', prometheus_metrics),
+    Route('/games', list_games),
+    Route('/games/{title}', get_game),
+    Route('/copies/{copy_id}', get_copy),
+    Route('/clients/{client_id}/history', client_history),
+    Route('/rentals', list_rentals),
+    Route('/rentals', create_rental, methods=['POST']),
+    Route('/returns', create_return, methods=['POST']),
+    Route('/overdue', list_overdue),
+    Route('/export/{collection}', export_collection),
+]
+
+app = Starlette(routes=routes)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    uvicorn.run(app, host=os.environ.get('BORROW_APP_API_HOST', '127.0.0.1'), port=int(os.environ.get('BORROW_APP_API_PORT', '8000')))
@@ -0,0 +1,42 @@
+"""Pomiar czasu rerunu ekranu 'Wypożyczenie gry' w zależności od wielkości katalogu.
+
+Uruchomienie: python benchmarks/bench_rerun.py [liczby gier ...]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from generate_data import APP_DIR, generate
+
+RERUNS = 10
+
+
+def measure(n_games):
+    st.cache_resource.clear()
+    with tempfile.TemporaryDirectory() as directory:
+        # Sam katalog i klienci - bez wypożyczeń i historii
+        generate(directory, n_games, n_games, n_active=0, years=0, rentals_per_day=0)
+        os.chdir(directory)
+        at = AppTest.from_file(os.path.join(APP_DIR, 'app.py'), default_timeout=120)
+        start = time.perf_counter()
+        at.run()
+        first_run = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(RERUNS):
+            at.run()
+        rerun = (time.perf_counter() - start) / RERUNS
+        os.chdir(APP_DIR)
+    return first_run, rerun
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100, 1000, 5000]
+    os.environ['BORROW_APP_STORAGE'] = 'json'
+    print(f"{'gry/klienci':>12} {'pierwszy run [ms]':>18} {'rerun [ms]':>12}")
+    for n in sizes:
+        first_run, rerun = measure(n)
+        print(f"{n:>12} {first_run * 1000:>18.1f} {rerun * 1000:>12.1f}")
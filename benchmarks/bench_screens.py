@@ -0,0 +1,48 @@
+"""Czas rerunu ekranów 'Wypożyczenie gry' i 'Zarządzanie grami' przy dużych danych.
+
+Uruchomienie: python benchmarks/bench_screens.py [liczba_gier liczba_klientów]
+Kończy się kodem 1, jeśli średni rerun przekroczy RERUN_BUDGET_S.
+"""
+import os
+import sys
+import tempfile
+import time
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from generate_data import APP_DIR, generate
+
+SCREENS = ["Wypożyczenie gry", "Zarządzanie grami"]
+RERUNS = 5
+RERUN_BUDGET_S = 1.5
+
+
+def measure_screens(n_games, n_clients):
+    st.cache_resource.clear()
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        generate(directory, n_games, n_clients, n_active=0, years=0, rentals_per_day=0)
+        os.chdir(directory)
+        at = AppTest.from_file(os.path.join(APP_DIR, 'app.py'), default_timeout=300)
+        at.run()
+        for screen in SCREENS:
+            at.sidebar.radio[0].set_value(screen).run()
+            start = time.perf_counter()
+            for _ in range(RERUNS):
+                at.run()
+            results[screen] = (time.perf_counter() - start) / RERUNS
+        os.chdir(APP_DIR)
+    return results
+
+
+if __name__ == '__main__':
+    n_games, n_clients = (int(arg) for arg in sys.argv[1:3]) if len(sys.argv) > 2 else (10_000, 50_000)
+    os.environ['BORROW_APP_STORAGE'] = 'json'
+    results = measure_screens(n_games, n_clients)
+    over_budget = False
+    for screen, seconds in results.items():
+        status = "OK" if seconds <= RERUN_BUDGET_S else "ZA WOLNO"
+        over_budget = over_budget or seconds > RERUN_BUDGET_S
+        print(f"{screen:<20} {seconds * 1000:>8.1f} ms  [{status}]")
+    sys.exit(1 if over_budget else 0)
@@ -0,0 +1,140 @@
+"""Sprawdzenie migracji danych sprzed stałych ID (powiązania po nazwach -> powiązania po ID).
+
+Generator zapisuje z tego samego ziarna dwa katalogi: dane z ID (wzorzec) i te same dane
+w formacie sprzed ID. Drugi katalog otwierany jest przez DataStore (migracja), po czym
+sprawdzane jest, że:
+  - gry, klienci i wypożyczenia mają unikalne ID, a liczby rekordów się nie zmieniły,
+  - wypożyczenia i wpisy historii wskazują po ID te same gry i tych samych klientów co wzorzec
+    (gra po tytule, klient po telefonie), a egzemplarz wypożyczenia należy do wskazanej gry,
+  - indeksy po ID (wypożyczenia i historia klienta, historia gry) dają te same wyniki co wzorzec,
+  - ponowne otwarcie nie migruje niczego drugi raz, a dane z ID nie są w ogóle zmieniane.
+
+Uruchomienie: python benchmarks/check_migration.py [--preset small] [--backend json|sqlite|all] [--seed 1]
+Kończy się kodem 1, jeśli któreś sprawdzenie się nie powiedzie.
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+from generate_data import APP_DIR, PRESETS, generate_preset  # Dodaje też katalog aplikacji do sys.path
+from data_store import DataStore
+from identifiers import CLIENT_ID, GAME_ID, RENTAL_ID
+from storage import DATA_FILES, open_storage
+
+
+def open_data_store(directory, backend):
+    os.chdir(directory)
+    return DataStore(open_storage(backend))
+
+
+def file_contents(directory):
+    contents = {}
+    for name, file_name in DATA_FILES.items():
+        path = os.path.join(directory, file_name)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                contents[name] = f.read()
+    return contents
+
+
+def check_unique_ids(problems, name, records, key):
+    ids = [record.get(key) for record in records]
+    if None in ids or '' in ids or len(set(ids)) != len(ids):
+        problems.append(f"{name}: brakujące lub zdublowane '{key}'")
+
+
+def check_links(problems, name, expected, migrated, game_ids, client_ids):
+    """Porównuje powiązania rekordów (w tej samej kolejności) po przełożeniu ID wzorca na ID po migracji."""
+    wrong = 0
+    for before, after in zip(expected, migrated):
+        if after.get(GAME_ID) != game_ids.get(before[GAME_ID]) or after.get(CLIENT_ID) != client_ids.get(before[CLIENT_ID]):
+            wrong += 1
+    if wrong:
+        problems.append(f"{name}: {wrong} rekordów wskazuje inną grę lub klienta niż przed migracją")
+
+
+def check(expected, migrated):
+    problems = []
+    for name in ('games', 'clients', 'rentals', 'history'):
+        if len(getattr(expected, name)) != len(getattr(migrated, name)):
+            problems.append(f"{name}: {len(getattr(migrated, name))} rekordów, oczekiwano {len(getattr(expected, name))}")
+    if problems:
+        return problems
+    check_unique_ids(problems, 'games', migrated.games, GAME_ID)
+    check_unique_ids(problems, 'clients', migrated.clients, CLIENT_ID)
+    check_unique_ids(problems, 'rentals', migrated.rentals, RENTAL_ID)
+
+    # ID wzorca -> ID po migracji, przez naturalne klucze (tytuły i telefony w generatorze są unikalne)
+    game_ids = {game[GAME_ID]: migrated.find_game(game['Nazwa Gry'])[GAME_ID] for game in expected.games}
+    client_ids = {client[CLIENT_ID]: migrated.find_client_by_phone(client['Telefon'])[CLIENT_ID] for client in expected.clients}
+    check_links(problems, 'rentals', expected.rentals, migrated.rentals, game_ids, client_ids)
+    check_links(problems, 'history', expected.history, migrated.history, game_ids, client_ids)
+
+    foreign_copies = sum(
+        1 for rental in migrated.rentals
+        if (migrated.game_for_copy(rental.get('Egzemplarz')) or {}).get(GAME_ID) != rental.get(GAME_ID)
+    )
+    if foreign_copies:
+        problems.append(f"rentals: {foreign_copies} wypożyczeń z egzemplarzem innej gry")
+
+    for client_id, migrated_id in client_ids.items():
+        if len(expected.rentals_for_client(client_id)) != len(migrated.rentals_for_client(migrated_id)):
+            problems.append("indeks wypożyczeń klienta różni się od wzorca")
+            break
+        if len(expected.client_history(client_id)) != len(migrated.client_history(migrated_id)):
+            problems.append("indeks historii klienta różni się od wzorca")
+            break
+    for game_id, migrated_id in game_ids.items():
+        if len(expected.game_history(game_id)) != len(migrated.game_history(migrated_id)):
+            problems.append("indeks historii gry różni się od wzorca")
+            break
+    return problems
+
+
+def run(preset, backend, seed):
+    problems = []
+    with tempfile.TemporaryDirectory() as directory:
+        expected_dir = os.path.join(directory, 'expected')
+        legacy_dir = os.path.join(directory, 'legacy')
+        generate_preset(expected_dir, preset, seed=seed)
+        generate_preset(legacy_dir, preset, seed=seed, legacy=True)
+        expected_files = file_contents(expected_dir)
+
+        expected = open_data_store(expected_dir, backend)
+        if file_contents(expected_dir) != expected_files:
+            problems.append("dane z ID zostały zmienione przy otwarciu")
+        migrated = open_data_store(legacy_dir, backend)
+        problems += check(expected, migrated)
+
+        # Drugie otwarcie: nic do migracji, te same ID i te same wersje na dysku
+        versions = migrated.storage.read_versions()
+        reopened = open_data_store(legacy_dir, backend)
+        if reopened.storage.read_versions() != versions:
+            problems.append("ponowne otwarcie zapisało dane jeszcze raz")
+        if [game[GAME_ID] for game in reopened.games] != [game[GAME_ID] for game in migrated.games]:
+            problems.append("ponowne otwarcie zmieniło ID gier")
+        os.chdir(APP_DIR)
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--preset', default='small', choices=list(PRESETS))
+    parser.add_argument('--backend', default='all', choices=['json', 'sqlite', 'all'])
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    failed = False
+    for backend in (['json', 'sqlite'] if args.backend == 'all' else [args.backend]):
+        problems = run(args.preset, backend, args.seed)
+        for problem in problems:
+            print(f"BŁĄD ({backend}): {problem}")
+        if not problems:
+            print(f"{backend}: migracja poprawna")
+        failed = failed or bool(problems)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""Generator syntetycznych danych o realistycznej wielkości: katalog gier z egzemplarzami,
+klienci, aktywne wypożyczenia (część po terminie) i wieloletnia historia.
+
+Dane zapisywane są w formacie aplikacji (games.json, clients.json, rentals.json,
+dziennik history_log/) razem ze stałymi ID i powiązaniami po ID, więc katalog można
+od razu otworzyć aplikacją:
+
+    python benchmarks/generate_data.py KATALOG [--preset medium] [--seed 1]
+    cd KATALOG && streamlit run /ścieżka/do/app.py
+
+Z --legacy zapisywane są te same dane w formacie sprzed ID (powiązania tylko po nazwach),
+np. do sprawdzenia migracji (benchmarks/check_migration.py).
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import uuid
+from datetime import date, datetime, timedelta
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+from history_log import HistoryLog  # noqa: E402
+from identifiers import CLIENT_ID, GAME_ID, ID_KEYS, RENTAL_ID  # noqa: E402
+from indexes import client_label  # noqa: E402
+from inventory import CopyIdGenerator, new_copies  # noqa: E402
+from storage import DATA_FILES, HISTORY_LOG_DIR  # noqa: E402
+
+# Rozmiary: (gry, klienci, aktywne wypożyczenia, lata historii, wypożyczeń dziennie)
+PRESETS = {
+    'small': (500, 1000, 50, 1, 10),
+    'medium': (5000, 20000, 500, 3, 40),
+    'large': (20000, 100000, 2000, 5, 120),
+}
+
+FIRST_NAMES = ['Anna', 'Piotr', 'Katarzyna', 'Paweł', 'Małgorzata', 'Łukasz', 'Zofia', 'Jakub', 'Agnieszka', 'Michał',
+               'Ewa', 'Krzysztof', 'Joanna', 'Tomasz', 'Żaneta', 'Grzegorz', 'Barbara', 'Wojciech', 'Magdalena', 'Jerzy']
+LAST_NAMES = ['Nowak', 'Kowalski', 'Wiśniewski', 'Wójcik', 'Kowalczyk', 'Kamiński', 'Lewandowski', 'Zieliński',
+              'Szymański', 'Woźniak', 'Dąbrowski', 'Kozłowski', 'Jankowski', 'Mazur', 'Krawczyk', 'Łęcki']
+TITLE_WORDS = ['Wyspa', 'Zamek', 'Smoki', 'Kolejka', 'Osadnicy', 'Podróż', 'Skarb', 'Królestwo', 'Labirynt', 'Pociągi',
+               'Gwiazdy', 'Ogród', 'Farma', 'Miasto', 'Piraci', 'Rycerze', 'Tajemnica', 'Wilki', 'Żółw', 'Łąka']
+
+
+def _new_id(rng):
+    """ID w formacie identifiers.new_id, ale z generatora losowego - te same dane dla tego samego ziarna."""
+    return uuid.UUID(int=rng.getrandbits(128), version=4).hex
+
+
+def _without_ids(record):
+    return {key: value for key, value in record.items() if key not in ID_KEYS}
+
+
+def generate(directory, n_games, n_clients, n_active, years, rentals_per_day, seed=1, today=None, legacy=False):
+    """Zapisuje dane do katalogu. Zwraca liczbę rekordów w każdej kolekcji.
+
+    Przy `legacy` rekordy zapisywane są bez ID (jak przed migracją); poza tym dane są identyczne.
+    """
+    rng = random.Random(seed)
+    today = today or date.today()
+    os.makedirs(directory, exist_ok=True)
+    strip = _without_ids if legacy else (lambda record: record)
+
+    id_generator = CopyIdGenerator([])
+    games = []
+    for i in range(n_games):
+        title = f"{rng.choice(TITLE_WORDS)} {rng.choice(TITLE_WORDS).lower()} {i}"
+        games.append({GAME_ID: _new_id(rng), 'Nazwa Gry': title, 'Dostępna': True,
+                      'Egzemplarze': new_copies(id_generator, rng.choice([1, 1, 1, 2, 3]))})
+
+    clients = [
+        {CLIENT_ID: _new_id(rng), 'Imię': rng.choice(FIRST_NAMES), 'Nazwisko': rng.choice(LAST_NAMES), 'Telefon': f"5{i:08d}"}
+        for i in range(n_clients)
+    ]
+
+    # Aktywne wypożyczenia - część z nich już po terminie
+    rentals = []
+    for game in rng.sample(games, min(n_active, n_games)):
+        copy = game['Egzemplarze'][0]
+        copy['Dostępny'] = False
+        game['Dostępna'] = any(c['Dostępny'] for c in game['Egzemplarze'])
+        client = rng.choice(clients)
+        start = today - timedelta(days=rng.randint(1, 20))
+        end = start + timedelta(days=rng.randint(1, 14))
+        daily_cost = rng.choice([5, 5, 7, 10])
+        rentals.append({
+            RENTAL_ID: _new_id(rng), GAME_ID: game[GAME_ID], CLIENT_ID: client[CLIENT_ID],
+            'Klient': client_label(client), 'Tytuł Gry': game['Nazwa Gry'], 'Od': start.isoformat(), 'Do': end.isoformat(),
+            'Koszt': max(1, (end - start).days) * daily_cost, 'Cena za dzień': daily_cost, 'Egzemplarz': copy['ID'],
+        })
+
+    for name, data in (('games', games), ('clients', clients), ('rentals', rentals)):
+        with open(os.path.join(directory, DATA_FILES[name]), 'w', encoding='utf-8') as f:
+            json.dump([strip(record) for record in data], f, ensure_ascii=False)
+
+    # Historia: wypożyczenie i zwrot (czasem po terminie) dla każdego dnia z ostatnich lat.
+    # Oba wpisy jednego wypożyczenia mają to samo ID wypożyczenia, gry i klienta.
+    history_log = HistoryLog(os.path.join(directory, HISTORY_LOG_DIR))
+    history_log.clear()
+    entries = []
+    day = today - timedelta(days=365 * years)
+    while day < today:
+        for _ in range(rng.randint(rentals_per_day // 2, rentals_per_day * 3 // 2)):
+            game = rng.choice(games)
+            client = rng.choice(clients)
+            links = {RENTAL_ID: _new_id(rng), GAME_ID: game[GAME_ID], CLIENT_ID: client[CLIENT_ID]}
+            cost = rng.randint(1, 14) * 5
+            moment = datetime.combine(day, datetime.min.time()) + timedelta(seconds=rng.randint(9 * 3600, 20 * 3600))
+            entries.append((moment, 'Wypożyczenie', game['Nazwa Gry'], client_label(client), cost, 0, links))
+            late_fee = rng.choice([0, 0, 0, 0, 5, 10, 25])
+            entries.append((moment + timedelta(days=rng.randint(1, 14)), 'Zwrot', game['Nazwa Gry'], client_label(client), cost, late_fee, links))
+        day += timedelta(days=1)
+    # Kolejność zdarzeń - po czasie (ID nie biorą udziału w porównaniu)
+    entries.sort(key=lambda entry: entry[:6])
+    lines = [
+        json.dumps(strip({
+            'Data': moment.strftime("%Y-%m-%d %H:%M:%S"), 'Typ zdarzenia': event_type, 'Tytuł Gry': title,
+            'Klient': client, 'Koszt': cost, 'Opłata za zwłokę': late_fee, 'Suma': cost + late_fee, **links,
+        }), ensure_ascii=False) + '\n'
+        for moment, event_type, title, client, cost, late_fee, links in entries
+        if moment.date() < today
+    ]
+    # Segmenty tej samej wielkości, jakie tworzy dziennik przy zwykłej pracy
+    segment_size = history_log.segment_max_records
+    for number, offset in enumerate(range(0, len(lines), segment_size), start=1):
+        with open(history_log._segment_path(number), 'w', encoding='utf-8') as f:
+            f.writelines(lines[offset:offset + segment_size])
+    count = len(lines)
+    return {'games': len(games), 'clients': len(clients), 'rentals': len(rentals), 'history': count}
+
+
+def generate_preset(directory, preset, seed=1, legacy=False):
+    return generate(directory, *PRESETS[preset], seed=seed, legacy=legacy)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generator syntetycznych danych do testów wydajności.")
+    parser.add_argument('directory')
+    parser.add_argument('--preset', default='medium', choices=list(PRESETS))
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--legacy', action='store_true', help="Zapisz dane bez ID (format sprzed migracji)")
+    args = parser.parse_args()
+    counts = generate_preset(args.directory, args.preset, args.seed, args.legacy)
+    print(', '.join(f"{name}: {count}" for name, count in counts.items()))
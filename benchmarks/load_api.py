@@ -0,0 +1,136 @@
+"""Test obciążeniowy API HTTP (api.py): równoległe wypożyczenia i zwroty po kodzie egzemplarza.
+
+Uruchamia serwer uvicorn na tymczasowych danych, a N wątków-klientów (jak kasy
+i czytniki kodów) wykonuje w pętli: POST /rentals -> GET /copies/{id} -> POST /returns.
+Wypisuje przepustowość i percentyle opóźnień dla każdego typu żądania.
+
+Uruchomienie: python benchmarks/load_api.py [--backend sqlite|json] [--clients 16] [--seconds 10]
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from generate_data import APP_DIR, generate
+from storage import DATA_FILES
+
+N_GAMES = 200
+N_CLIENTS = 500
+
+
+def write_dataset(directory):
+    """Dane z generatora (bez wypożyczeń i historii); zwraca tytuły gier do losowania w żądaniach."""
+    generate(directory, N_GAMES, N_CLIENTS, n_active=0, years=0, rentals_per_day=0)
+    with open(os.path.join(directory, DATA_FILES['games']), 'r', encoding='utf-8') as f:
+        return [game['Nazwa Gry'] for game in json.load(f)]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_for_server(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/health')
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("Serwer API nie wystartował.")
+
+
+def client_loop(port, titles, seed, stop, latencies, statuses):
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+
+    def call(kind, method, path, body=None):
+        payload = None if body is None else json.dumps(body)
+        start = time.perf_counter()
+        conn.request(method, path, body=payload, headers={'Content-Type': 'application/json'})
+        response = conn.getresponse()
+        data = response.read()
+        latencies[kind].append(time.perf_counter() - start)
+        statuses[(kind, response.status)] = statuses.get((kind, response.status), 0) + 1
+        return response.status, json.loads(data)
+
+    while not stop.is_set():
+        status, rental = call('POST /rentals', 'POST', '/rentals', {
+            'phone': f"5{rng.randrange(N_CLIENTS):08d}",
+            'title': rng.choice(titles),
+            'date_from': '2026-01-01',
+            'date_to': '2026-01-08',
+        })
+        if status != 201:
+            continue
+        call('GET /copies', 'GET', f"/copies/{rental['Egzemplarz']}")
+        call('POST /returns', 'POST', '/returns', {'copy_id': rental['Egzemplarz'], 'return_date': '2026-01-10'})
+    conn.close()
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--backend', default='sqlite', choices=['sqlite', 'json'])
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        titles = write_dataset(directory)
+        port = free_port()
+        env = dict(os.environ, BORROW_APP_STORAGE=args.backend, PYTHONPATH=APP_DIR)
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'uvicorn', 'api:app', '--port', str(port), '--log-level', 'warning'],
+            cwd=directory, env=env
+        )
+        try:
+            wait_for_server(port)
+            stop = threading.Event()
+            kinds = ('POST /rentals', 'GET /copies', 'POST /returns')
+            latencies = {kind: [] for kind in kinds}
+            statuses = {}
+            threads = [
+                threading.Thread(target=client_loop, args=(port, titles, seed, stop, latencies, statuses))
+                for seed in range(args.clients)
+            ]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            time.sleep(args.seconds)
+            stop.set()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+        finally:
+            server.terminate()
+            server.wait()
+
+    total = sum(len(values) for values in latencies.values())
+    print(f"backend: {args.backend}, klienci: {args.clients}, czas: {elapsed:.1f} s, żądania: {total} ({total / elapsed:.0f}/s)")
+    print(f"{'żądanie':<16} {'liczba':>8} {'p50 [ms]':>10} {'p95 [ms]':>10} {'p99 [ms]':>10}")
+    for kind in kinds:
+        values = latencies[kind]
+        if values:
+            print(f"{kind:<16} {len(values):>8} {percentile(values, 0.5) * 1000:>10.1f} "
+                  f"{percentile(values, 0.95) * 1000:>10.1f} {percentile(values, 0.99) * 1000:>10.1f}")
+    print("statusy: " + ', '.join(f"{kind} {status}: {count}" for (kind, status), count in sorted(statuses.items())))
+
+
+if __name__ == '__main__':
+    main()
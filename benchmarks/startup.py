@@ -0,0 +1,124 @@
+"""Pomiar zimnego startu: import modułów aplikacji, pierwsze wyrenderowanie ekranu
+(Streamlit AppTest) i start API - każdy pomiar w nowym procesie Pythona.
+
+Z opcją --against porównuje bieżące drzewo z inną rewizją git (rozpakowaną do
+katalogu tymczasowego), np. stanem sprzed leniwego ładowania modułów:
+
+    python benchmarks/startup.py [--preset small] [--repeat 5] [--against HEAD~1]
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(BENCHMARKS_DIR)
+sys.path.insert(0, APP_DIR)
+
+from generate_data import PRESETS, generate_preset  # noqa: E402
+
+# Kod uruchamiany w procesie potomnym; wypisuje JSON z czasami [s] i listą bibliotek wczytanych
+# do chwili pomiaru (dla 'first_paint' - po pierwszym ekranie, przed przejściem na drugi)
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+def loaded():
+    return [name for name in ('pandas', 'numpy', 'babel', 'pytz') if name in sys.modules]
+results = {}
+scenario = sys.argv[1]
+if scenario == 'import':
+    import storage, data_store, views, services, overdue, bulk_io, metrics
+    results['import'] = time.perf_counter() - started
+elif scenario == 'first_paint':
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(sys.argv[2], default_timeout=600)
+    paint_started = time.perf_counter()
+    at.run()
+    if at.exception:
+        raise SystemExit(at.exception[0].message)
+    results['first_paint'] = time.perf_counter() - paint_started
+    results['loaded'] = loaded()
+    screen_started = time.perf_counter()
+    at.sidebar.radio[0].set_value("Zwrot gry").run()
+    results['second_screen'] = time.perf_counter() - screen_started
+elif scenario == 'api':
+    import api
+    results['api'] = time.perf_counter() - started
+results.setdefault('loaded', loaded())
+print(json.dumps(results))
+"""
+SCENARIOS = ['import', 'first_paint', 'api']
+
+
+def run_probe(app_dir, data_dir, scenario, backend):
+    env = dict(os.environ, PYTHONPATH=app_dir, BORROW_APP_STORAGE=backend)
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE, scenario, os.path.join(app_dir, 'app.py')],
+        cwd=data_dir, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    wall = time.perf_counter() - start
+    results = json.loads(output.strip().splitlines()[-1])
+    results[f"{scenario}/process"] = wall
+    return results
+
+
+def measure(app_dir, data_dir, backend, repeat):
+    """Najlepszy czas z `repeat` nowych procesów dla każdego scenariusza."""
+    # Rozgrzewka: jednorazowy import danych do SQLite i pamięć podręczna systemu plików
+    run_probe(app_dir, data_dir, 'first_paint', backend)
+    best, loaded = {}, {}
+    for scenario in SCENARIOS:
+        for _ in range(repeat):
+            results = run_probe(app_dir, data_dir, scenario, backend)
+            loaded[scenario] = results.pop('loaded')
+            for name, value in results.items():
+                best[name] = min(value, best.get(name, value))
+    return best, loaded
+
+
+def export_revision(revision, directory):
+    """Rozpakowuje pliki wskazanej rewizji do katalogu (bez zmiany drzewa roboczego)."""
+    archive = subprocess.run(['git', 'archive', revision], cwd=APP_DIR, capture_output=True, check=True).stdout
+    os.makedirs(directory)
+    subprocess.run(['tar', '-x', '-C', directory], input=archive, check=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pomiar zimnego startu aplikacji i API.")
+    parser.add_argument('--preset', default='small', choices=list(PRESETS))
+    parser.add_argument('--backend', default='sqlite', choices=['sqlite', 'json'])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--against', help="Rewizja git do porównania (np. HEAD~1)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, 'data')
+        generate_preset(source, args.preset)
+        trees = [('teraz', APP_DIR)]
+        if args.against:
+            export_revision(args.against, os.path.join(directory, 'against'))
+            trees.insert(0, (args.against, os.path.join(directory, 'against')))
+        measured = []
+        for label, app_dir in trees:
+            data_dir = os.path.join(directory, f"data-{len(measured)}")
+            shutil.copytree(source, data_dir)
+            print(f"  {label}: pomiar...", flush=True)
+            measured.append((label, *measure(app_dir, data_dir, args.backend, args.repeat)))
+
+    names = list(measured[-1][1])
+    print(f"\n{'pomiar [ms]':<24}" + ''.join(f"{label:>14}" for label, _, _ in measured))
+    for name in names:
+        print(f"{name:<24}" + ''.join(f"{best.get(name, float('nan')) * 1000:>14.1f}" for _, best, _ in measured))
+    for label, _, loaded in measured:
+        print(f"\nwczytane biblioteki ({label}):")
+        for scenario in SCENARIOS:
+            print(f"  {scenario:<12} {', '.join(loaded[scenario]) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
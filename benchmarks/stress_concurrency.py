@@ -0,0 +1,136 @@
+"""Test obciążeniowy zapisu z kilku procesów naraz (np. kilka instancji aplikacji).
+
+Każdy proces ma własny DataStore na wspólnych plikach/bazie i losowo wypożycza,
+zwraca gry oraz dodaje klientów. Na końcu sprawdzana jest spójność danych:
+żadne wypożyczenie, klient ani wpis historii nie może zginąć, a każdy egzemplarz
+może być wypożyczony najwyżej raz.
+
+Uruchomienie: python benchmarks/stress_concurrency.py [--backend json|sqlite] [--processes 4] [--operations 200]
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+from generate_data import APP_DIR, generate  # Dodaje też katalog aplikacji do sys.path
+from data_store import DataConflictError, DataStore
+from identifiers import CLIENT_ID, GAME_ID, RENTAL_ID
+from indexes import client_label
+from storage import open_storage
+
+N_GAMES = 20
+N_CLIENTS = 50
+
+
+def write_dataset(directory):
+    # Bez wypożyczeń i historii - sprawdzenie spójności liczy je od zera. Dane w formacie
+    # sprzed ID, żeby migracja ruszyła naraz w kilku procesach
+    generate(directory, N_GAMES, N_CLIENTS, n_active=0, years=0, rentals_per_day=0, legacy=True)
+
+
+def history_entry(event_type, title, client):
+    return {'Data': time.strftime('%Y-%m-%d %H:%M:%S'), 'Typ zdarzenia': event_type, 'Tytuł Gry': title, 'Klient': client, 'Koszt': 5}
+
+
+def worker(directory, backend, operations, seed, results):
+    os.chdir(directory)
+    rng = random.Random(seed)
+    data_store = DataStore(open_storage(backend))
+    counts = {'rentals': 0, 'returns': 0, 'clients': 0, 'conflicts': 0}
+    for number in range(operations):
+        # Jak sesja w aplikacji: przed akcją odczyt aktualnego stanu
+        data_store.refresh()
+        action = rng.random()
+        try:
+            if action < 0.1:
+                data_store.add_client({'Imię': f"Nowy{seed}", 'Nazwisko': f"Klient{number}", 'Telefon': f"7{seed:02d}{number:06d}"})
+                counts['clients'] += 1
+            elif action < 0.6:
+                title = rng.choice(data_store.games)['Nazwa Gry']
+                client = rng.choice(data_store.clients)
+                rental = {CLIENT_ID: client[CLIENT_ID], 'Klient': client_label(client), 'Tytuł Gry': title, 'Od': '2026-01-01', 'Do': '2026-01-08', 'Koszt': 5, 'Cena za dzień': 5}
+                data_store.register_rental(rental, history_entry('Wypożyczenie', title, client_label(client)))
+                counts['rentals'] += 1
+            else:
+                rented = data_store.rented_games()
+                if not rented:
+                    continue
+                rental = rng.choice(rented)
+                data_store.return_rental(rental, history_entry('Zwrot', rental['Tytuł Gry'], rental['Klient']))
+                counts['returns'] += 1
+        except DataConflictError:
+            counts['conflicts'] += 1
+    results.put(counts)
+
+
+def check(directory, backend, totals):
+    os.chdir(directory)
+    data_store = DataStore(open_storage(backend))
+    problems = []
+    rented_copies = [rental['Egzemplarz'] for rental in data_store.rentals]
+    if len(rented_copies) != len(set(rented_copies)):
+        problems.append("ten sam egzemplarz wypożyczony więcej niż raz")
+    unavailable = {copy['ID'] for game in data_store.games for copy in game['Egzemplarze'] if not copy['Dostępny']}
+    if unavailable != set(rented_copies):
+        problems.append(f"stan egzemplarzy niezgodny z wypożyczeniami ({len(unavailable)} zajętych, {len(rented_copies)} wypożyczeń)")
+    if len(data_store.rentals) != totals['rentals'] - totals['returns']:
+        problems.append(f"liczba wypożyczeń {len(data_store.rentals)}, oczekiwano {totals['rentals'] - totals['returns']}")
+    if len(data_store.history) != totals['rentals'] + totals['returns']:
+        problems.append(f"wpisów historii {len(data_store.history)}, oczekiwano {totals['rentals'] + totals['returns']}")
+    if len(data_store.clients) != N_CLIENTS + totals['clients']:
+        problems.append(f"klientów {len(data_store.clients)}, oczekiwano {N_CLIENTS + totals['clients']}")
+    # Dane startowe nie mają ID - migracja uruchomiona naraz w kilku procesach musi nadać je raz
+    client_ids = {client.get(CLIENT_ID) for client in data_store.clients}
+    if None in client_ids or len(client_ids) != len(data_store.clients):
+        problems.append("brakujące lub zdublowane ID klientów")
+    game_ids = {game.get(GAME_ID) for game in data_store.games}
+    if None in game_ids or len(game_ids) != len(data_store.games):
+        problems.append("brakujące lub zdublowane ID gier")
+    if any(not entry.get(RENTAL_ID) or not entry.get(GAME_ID) for entry in data_store.history):
+        problems.append("wpisy historii bez ID wypożyczenia lub gry")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--backend', default='json', choices=['json', 'sqlite'])
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--operations', type=int, default=200)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as directory:
+        write_dataset(directory)
+        results = context.Queue()
+        processes = [
+            context.Process(target=worker, args=(directory, args.backend, args.operations, seed, results))
+            for seed in range(args.processes)
+        ]
+        start = time.perf_counter()
+        for process in processes:
+            process.start()
+        per_process = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - start
+
+        totals = {key: sum(counts[key] for counts in per_process) for key in per_process[0]}
+        problems = check(directory, args.backend, totals)
+        os.chdir(APP_DIR)
+
+    operations = totals['rentals'] + totals['returns'] + totals['clients']
+    print(f"backend: {args.backend}, procesy: {args.processes}, czas: {elapsed:.1f} s, "
+          f"udane operacje: {operations} ({operations / elapsed:.0f}/s), konflikty: {totals['conflicts']}")
+    print(f"wypożyczenia: {totals['rentals']}, zwroty: {totals['returns']}, nowi klienci: {totals['clients']}")
+    if problems:
+        for problem in problems:
+            print(f"BŁĄD: {problem}")
+        sys.exit(1)
+    print("Dane spójne - brak utraconych zmian.")
+
+
+if __name__ == '__main__':
+    main()
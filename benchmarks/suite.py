@@ -0,0 +1,164 @@
+"""Zestaw testów wydajności na syntetycznych danych (benchmarks/generate_data.py).
+
+Mierzy (najlepszy czas z kilku powtórzeń - najmniej wrażliwy na szum):
+  - odczyt i zapis kolekcji w magazynie oraz start DataStore,
+  - wypożyczenie i zwrot (services.rent_game / services.return_copy),
+  - rerun każdego ekranu aplikacji (Streamlit AppTest),
+i porównuje wyniki z zapisaną linią bazową. Kończy się kodem 1 przy regresji.
+
+Uruchomienie:
+    python benchmarks/suite.py [--preset medium] [--backend json|sqlite|all]
+    python benchmarks/suite.py --update-baseline     # zapis nowej linii bazowej
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+import streamlit as st  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+import services  # noqa: E402
+from data_store import DataStore  # noqa: E402
+from generate_data import PRESETS, generate_preset  # noqa: E402
+from identifiers import CLIENT_ID  # noqa: E402
+from storage import COLLECTIONS, open_storage  # noqa: E402
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+SCREENS = ["Wypożyczenie gry", "Zwrot gry", "Zaległe zwroty", "Zarządzanie grami", "Zarządzanie klientami", "Historia", "Raporty"]
+REPEAT = 5
+OPERATIONS = 20
+# Regresja: wolniej o więcej niż TOLERANCE (względnie) i o więcej niż MIN_DIFFERENCE_S (bezwzględnie)
+TOLERANCE = 0.5
+MIN_DIFFERENCE_S = 0.02
+
+
+def best_time(function, repeat=REPEAT):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def bench_storage(backend, results):
+    storage = open_storage(backend)
+    for name in COLLECTIONS:
+        data = storage.load(name, [])
+        results[f"{backend}/load/{name}"] = best_time(lambda: storage.load(name, []))
+        results[f"{backend}/save/{name}"] = best_time(lambda: storage.save(name, data))
+    results[f"{backend}/load/history"] = best_time(storage.read_history, repeat=3)
+    results[f"{backend}/datastore_init"] = best_time(lambda: DataStore(open_storage(backend)), repeat=3)
+
+
+def bench_operations(backend, results):
+    data_store = DataStore(open_storage(backend))
+    client_id = data_store.clients[0][CLIENT_ID]
+    titles = [game['Nazwa Gry'] for game in data_store.games if game.get('Dostępna', True)][:OPERATIONS]
+    start_date = date.today()
+    rent_times, return_times = [], []
+    for title in titles:
+        start = time.perf_counter()
+        rental = services.rent_game(data_store, client_id, title, start_date, start_date + timedelta(days=7))
+        rent_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        services.return_copy(data_store, rental['Egzemplarz'])
+        return_times.append(time.perf_counter() - start)
+    results[f"{backend}/rent"] = min(rent_times)
+    results[f"{backend}/return"] = min(return_times)
+
+
+def bench_screens(backend, results):
+    os.environ['BORROW_APP_STORAGE'] = backend
+    # Bez archiwizacji przy starcie: dane obejmują kilka lat historii, więc przy domyślnym horyzoncie
+    # pierwszy run mierzyłby jednorazowe przeniesienie do archiwum zamiast zwykłego startu
+    os.environ['BORROW_APP_HISTORY_RETENTION_DAYS'] = '0'
+    st.cache_resource.clear()
+    at = AppTest.from_file(os.path.join(APP_DIR, 'app.py'), default_timeout=600)
+    start = time.perf_counter()
+    at.run()
+    results[f"{backend}/screen/first_run"] = time.perf_counter() - start
+    for screen in SCREENS:
+        at.sidebar.radio[0].set_value(screen).run()
+        if at.exception:
+            raise RuntimeError(f"Ekran '{screen}': {at.exception[0].message}")
+        results[f"{backend}/screen/{screen}"] = best_time(at.run)
+
+
+def run_suite(preset, backends):
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, 'data')
+        counts = generate_preset(source, preset)
+        print(f"Dane ({preset}): " + ', '.join(f"{name}: {count}" for name, count in counts.items()))
+        for backend in backends:
+            # Każdy backend na własnej kopii - pomiary zmieniają dane
+            work_dir = os.path.join(directory, backend)
+            shutil.copytree(source, work_dir)
+            os.chdir(work_dir)
+            open_storage(backend)  # Jednorazowy import do SQLite poza pomiarem
+            for step in (bench_storage, bench_operations, bench_screens):
+                print(f"  {backend}: {step.__name__}...", flush=True)
+                step(backend, results)
+            os.chdir(APP_DIR)
+    return results
+
+
+def compare(results, baseline):
+    """Wypisuje tabelę wyników i zwraca listę regresji."""
+    regressions = []
+    print(f"\n{'pomiar':<40} {'bazowy [ms]':>12} {'teraz [ms]':>12} {'zmiana':>8}")
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            print(f"{name:<40} {'-':>12} {current * 1000:>12.1f} {'nowy':>8}")
+            continue
+        change = (current - previous) / previous if previous else 0
+        regression = current > previous * (1 + TOLERANCE) and current - previous > MIN_DIFFERENCE_S
+        if regression:
+            regressions.append(name)
+        print(f"{name:<40} {previous * 1000:>12.1f} {current * 1000:>12.1f} {change:>+8.0%}{'  REGRESJA' if regression else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Testy wydajności na syntetycznych danych.")
+    parser.add_argument('--preset', default='medium', choices=list(PRESETS))
+    parser.add_argument('--backend', default='all', choices=['json', 'sqlite', 'all'])
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--update-baseline', action='store_true', help="Zapisz wyniki jako nową linię bazową")
+    args = parser.parse_args()
+
+    backends = ['json', 'sqlite'] if args.backend == 'all' else [args.backend]
+    results = run_suite(args.preset, backends)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            stored = json.load(f)
+        if stored.get('preset') == args.preset:
+            baseline = stored['results']
+        else:
+            print(f"Linia bazowa dotyczy zestawu '{stored.get('preset')}' - brak porównania.")
+    regressions = compare(results, baseline)
+
+    if args.update_baseline:
+        stored_results = dict(baseline, **results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'preset': args.preset, 'results': stored_results}, f, ensure_ascii=False, indent=4)
+        print(f"\nZapisano linię bazową: {args.baseline}")
+    elif regressions:
+        print(f"\nRegresje ({len(regressions)}): {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
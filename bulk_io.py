@@ -0,0 +1,221 @@
+import csv
+import io
+import json
+import os
+
+from identifiers import CLIENT_ID, GAME_ID, RENTAL_ID
+
+# Komentarz: Masowy import gier i klientów (CSV/XLSX) oraz eksport danych do CSV/Parquet.
+# Import jest walidowany i deduplikowany przed zapisem, a zapis odbywa się jedną
+# operacją zamiast osobnego zapisu pliku dla każdego rekordu. Eksport zapisuje
+# rekordy partiami, bez budowania całego pliku w pamięci.
+
+GAME_COLUMNS = ['Nazwa Gry']
+GAME_COPIES_COLUMN = 'Liczba egzemplarzy'
+CLIENT_COLUMNS = ['Imię', 'Nazwisko', 'Telefon']
+
+EXPORT_COLUMNS = {
+    'games': [GAME_ID, 'Nazwa Gry', 'Dostępna', 'Egzemplarze'],
+    'clients': [CLIENT_ID, 'Imię', 'Nazwisko', 'Telefon'],
+    'rentals': [RENTAL_ID, CLIENT_ID, GAME_ID, 'Klient', 'Tytuł Gry', 'Egzemplarz', 'Od', 'Do', 'Koszt', 'Cena za dzień'],
+    'history': ['Data', 'Typ zdarzenia', RENTAL_ID, CLIENT_ID, GAME_ID, 'Tytuł Gry', 'Klient', 'Koszt', 'Opłata za zwłokę', 'Suma'],
+}
+
+EXPORT_BATCH_SIZE = 10000
+
+
+class ImportFormatError(Exception):
+    """Plik importu ma nieobsługiwany format lub brakuje w nim wymaganych kolumn."""
+
+
+# --- Import ---
+def read_table(source, filename):
+    """Wczytuje tabelę z pliku CSV lub XLSX. Wszystkie wartości są tekstem (zachowanie zer w numerach)."""
+    import pandas as pd
+
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == '.csv':
+        content = source.read()
+        text = content.decode('utf-8-sig') if isinstance(content, bytes) else content
+        # Excel w polskiej wersji zapisuje CSV ze średnikiem
+        header = text.split('\n', 1)[0]
+        separator = ';' if header.count(';') > header.count(',') else ','
+        df = pd.read_csv(io.StringIO(text), dtype=str, keep_default_na=False, sep=separator)
+    elif extension in ('.xlsx', '.xls'):
+        try:
+            df = pd.read_excel(source, dtype=str)
+        except ImportError as e:
+            raise ImportFormatError("Import z Excela wymaga pakietu 'openpyxl'.") from e
+    else:
+        raise ImportFormatError(f"Nieobsługiwany format pliku: {extension or filename}")
+    return df.fillna('')
+
+
+def _match_columns(df, required):
+    """Dopasowuje nagłówki bez względu na wielkość liter i spacje; zwraca DataFrame z wymaganymi kolumnami."""
+    by_name = {str(column).strip().casefold(): column for column in df.columns}
+    missing = [name for name in required if name.casefold() not in by_name]
+    if missing:
+        raise ImportFormatError(f"Brak wymaganych kolumn: {', '.join(missing)}")
+    result = df[[by_name[name.casefold()] for name in required]]
+    result.columns = required
+    return result.apply(lambda column: column.astype(str).str.strip())
+
+
+def prepare_games(df, existing_titles):
+    """Zwraca (nowe gry, pominięte wiersze). Pomijane są puste nazwy i duplikaty (w pliku i w bazie).
+
+    Opcjonalna kolumna 'Liczba egzemplarzy' określa liczbę egzemplarzy (domyślnie 1).
+    """
+    has_copies = GAME_COPIES_COLUMN.casefold() in {str(column).strip().casefold() for column in df.columns}
+    df = _match_columns(df, GAME_COLUMNS + ([GAME_COPIES_COLUMN] if has_copies else []))
+    seen = set(existing_titles)
+    games, skipped = [], []
+    for row_number, row in enumerate(df.itertuples(index=False), start=2):
+        title = row[0]
+        copies = row[1] if has_copies else '1'
+        if not title:
+            skipped.append((row_number, title, "pusta nazwa"))
+        elif title in seen:
+            skipped.append((row_number, title, "gra już istnieje"))
+        elif not copies.isdigit() or int(copies) < 1:
+            skipped.append((row_number, title, "niepoprawna liczba egzemplarzy"))
+        else:
+            seen.add(title)
+            games.append({'Nazwa Gry': title, 'Dostępna': True, GAME_COPIES_COLUMN: int(copies)})
+    return games, skipped
+
+
+def prepare_clients(df, existing_phones):
+    """Zwraca (nowi klienci, pominięte wiersze). Duplikaty rozpoznawane są po numerze telefonu."""
+    df = _match_columns(df, CLIENT_COLUMNS)
+    seen = {str(phone) for phone in existing_phones}
+    clients, skipped = [], []
+    for row_number, (first_name, last_name, phone) in enumerate(df.itertuples(index=False), start=2):
+        label = f"{first_name} {last_name} ({phone})"
+        if not (first_name and last_name and phone):
+            skipped.append((row_number, label, "niekompletne dane"))
+        elif phone in seen:
+            skipped.append((row_number, label, "klient o tym numerze już istnieje"))
+        else:
+            seen.add(phone)
+            clients.append({'Imię': first_name, 'Nazwisko': last_name, 'Telefon': phone})
+    return clients, skipped
+
+
+# --- Eksport ---
+def export_columns(name, first_record):
+    """Stałe kolumny kolekcji uzupełnione o ewentualne dodatkowe pola rekordów."""
+    columns = list(EXPORT_COLUMNS[name])
+    if first_record:
+        columns += [key for key in first_record if key not in columns]
+    return columns
+
+
+def _flatten(record):
+    """Zagnieżdżone pola (np. lista egzemplarzy) zapisywane są jako JSON."""
+    return {
+        key: json.dumps(value, ensure_ascii=False) if isinstance(value, (list, dict)) else value
+        for key, value in record.items()
+    }
+
+
+def iter_csv_chunks(records, columns, batch_size=EXPORT_BATCH_SIZE):
+    """Generuje kolejne fragmenty pliku CSV (nagłówek + partie wierszy)."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction='ignore')
+    writer.writeheader()
+    count = 0
+    for record in records:
+        writer.writerow(_flatten(record))
+        count += 1
+        if count % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export_csv(records, columns, path):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        for chunk in iter_csv_chunks(records, columns):
+            f.write(chunk)
+
+
+def export_parquet(records, columns, path, batch_size=EXPORT_BATCH_SIZE):
+    """Zapisuje rekordy do pliku Parquet partiami (wymaga pakietu 'pyarrow')."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # Wszystkie kolumny jako tekst - stare rekordy bywają niespójne typami
+    schema = pa.schema([(column, pa.string()) for column in columns])
+    with pq.ParquetWriter(path, schema) as writer:
+        batch = []
+        for record in records:
+            record = _flatten(record)
+            batch.append({column: None if record.get(column) is None else str(record.get(column)) for column in columns})
+            if len(batch) >= batch_size:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                batch = []
+        if batch:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+
+
+def export_records(name, records, path):
+    """Eksportuje rekordy do pliku CSV lub Parquet (format wg rozszerzenia). Zwraca liczbę rekordów."""
+    records = iter(records)
+    first = next(records, None)
+    columns = export_columns(name, first)
+    count = 0
+
+    def counted():
+        nonlocal count
+        if first is not None:
+            count += 1
+            yield first
+        for record in records:
+            count += 1
+            yield record
+
+    if path.lower().endswith('.parquet'):
+        export_parquet(counted(), columns, path)
+    else:
+        export_csv(counted(), columns, path)
+    return count
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from data_store import DataStore
+    from storage import open_storage
+
+    parser = argparse.ArgumentParser(description="Masowy import gier/klientów i eksport danych.")
+    parser.add_argument('--backend', default=os.environ.get('BORROW_APP_STORAGE', 'sqlite'), choices=['sqlite', 'json'])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    import_parser = subparsers.add_parser('import', help="Import gier lub klientów z pliku CSV/XLSX")
+    import_parser.add_argument('collection', choices=['games', 'clients'])
+    import_parser.add_argument('path')
+    export_parser = subparsers.add_parser('export', help="Eksport do pliku CSV lub Parquet")
+    export_parser.add_argument('collection', choices=list(EXPORT_COLUMNS))
+    export_parser.add_argument('path')
+    args = parser.parse_args()
+
+    storage = open_storage(args.backend)
+    if args.command == 'import':
+        data_store = DataStore(storage)
+        with open(args.path, 'rb') as f:
+            table = read_table(f, args.path)
+        if args.collection == 'games':
+            records, skipped = prepare_games(table, data_store.index.game_positions)
+            added = data_store.add_games_bulk(records)
+        else:
+            records, skipped = prepare_clients(table, data_store.index.client_positions_by_phone)
+            added = data_store.add_clients_bulk(records)
+        for row_number, value, reason in skipped:
+            print(f"Pominięto wiersz {row_number} ({value}): {reason}")
+        print(f"Zaimportowano: {added}, pominięto: {len(skipped)}")
+    else:
+        count = export_records(args.collection, storage.iter_records(args.collection), args.path)
+        print(f"Wyeksportowano: {count}")
@@ -0,0 +1,618 @@
+import itertools
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from history_archive import retention_cutoff
+from identifiers import CLIENT_ID, GAME_ID, RENTAL_ID, missing_ids, new_id, with_id
+from indexes import DataIndex, HistoryIndex, LegacyLinks, client_label
+from inventory import CopyIdGenerator, with_copies, with_copy_count, with_copy_status
+from metrics import timed
+from reports import ReportAggregates
+from search import SearchIndex
+from storage import HISTORY_CLEARED
+
+# Komentarz: Wspólny dla całego procesu magazyn danych w pamięci. Wszystkie sesje
+# (terminale przy ladzie) czytają te same listy, a zmiany przechodzą wyłącznie
+# przez metody poniżej, chronione jedną blokadą. Listy są podmieniane w całości
+# (kopiowanie przy zapisie), więc sesja, która właśnie je czyta, nie widzi zmian
+# w połowie operacji. Każda zmiana zwiększa `version` (oraz wersję zmienionej
+# kolekcji w `versions`), po której sesje poznają, że ich widoki są nieaktualne.
+#
+# Ten sam magazyn może zmieniać też inny proces. Każdy zapis odbywa się w transakcji
+# magazynu (blokada międzyprocesowa), a przed zmianą DataStore porównuje znaczniki
+# wersji z dysku z ostatnio widzianymi i w razie potrzeby wczytuje zmienione kolekcje.
+# Walidacja (np. czy egzemplarz jest wolny) działa więc zawsze na aktualnych danych:
+# niezależne zmiany z obu procesów są zachowane, a sprzeczne kończą się DataConflictError.
+#
+# Rekordy sprzed wprowadzenia stałych ID (identifiers.py) dostają je przy wczytaniu,
+# a wypożyczenia i wpisy historii - powiązania z klientem i grą odtworzone z nazw.
+# Migracja jest od razu zapisywana (pod blokadą magazynu), więc wykonuje się raz.
+#
+# Z `retention_days` wpisy historii starsze niż horyzont przenoszone są przy starcie do
+# archiwum (history_archive.py) - w pamięci zostaje tylko bieżące okno historii.
+
+
+class DataConflictError(Exception):
+    """Operacja nie może zostać wykonana, bo dane zmieniły się w innej sesji."""
+
+
+def _entry_date(entry):
+    return entry.get('Data', '')
+
+
+class DataStore:
+    def __init__(self, storage, retention_days=None):
+        self.storage = storage
+        self._lock = threading.RLock()
+        self.version = 0
+        self.versions = {'games': 0, 'clients': 0, 'rentals': 0, 'history': 0}
+        # Kolekcje wczytane w starym formacie (bez ID) - do zapisania przez migrację
+        self._legacy = set()
+        with storage.transaction():
+            self._load_games()
+            self._load_clients()
+            self._load_rentals()
+            self._load_history()
+            self._assign_legacy_copies()
+            self._migrate_legacy_records()
+            if retention_days:
+                self._archive_history(retention_cutoff(retention_days))
+            # Znaczniki wersji z dysku odpowiadające wczytanym (i zmigrowanym) danym
+            self.stored_versions = storage.read_versions()
+        self.index = DataIndex(self.games, self.clients, self.rentals)
+        self._rebuild_history_views()
+        # Indeksy wyszukiwania budowane przy pierwszym użyciu
+        self._game_search = None
+        self._client_search = None
+
+    def _load_games(self):
+        games = self.storage.load('games', [])
+        if missing_ids(games, GAME_ID):
+            self._legacy.add('games')
+        self.copy_ids = CopyIdGenerator(games)
+        self.games = [with_id(with_copies(game, self.copy_ids), GAME_ID) for game in games]
+
+    def _load_clients(self):
+        clients = self.storage.load('clients', [])
+        if missing_ids(clients, CLIENT_ID):
+            self._legacy.add('clients')
+        self.clients = [with_id(client, CLIENT_ID) for client in clients]
+
+    def _load_rentals(self):
+        # Puste rekordy (np. '{}' w starym rentals.json) są pomijane
+        rentals = [rental for rental in self.storage.load('rentals', []) if rental]
+        if missing_ids(rentals, RENTAL_ID, CLIENT_ID, GAME_ID):
+            self._legacy.add('rentals')
+        self.rentals = [with_id(rental, RENTAL_ID) for rental in rentals]
+
+    def _load_history(self):
+        self.history = self.storage.read_history()
+        if missing_ids(self.history, CLIENT_ID, GAME_ID):
+            self._legacy.add('history')
+
+    def _migrate_legacy_records(self):
+        """Zapisuje nadane przy wczytaniu ID i uzupełnia powiązania po ID w wypożyczeniach i historii.
+
+        Wywoływane pod blokadą magazynu, po wczytaniu kolekcji. Zwraca True, jeśli coś zapisano.
+        """
+        if not self._legacy:
+            return False
+        links = LegacyLinks(self.games, self.clients)
+        for name in ('games', 'clients', 'rentals'):
+            if name not in self._legacy:
+                continue
+            if name == 'rentals':
+                self.rentals = [links.linked(rental) for rental in self.rentals]
+            self.storage.save(name, getattr(self, name))
+        if 'history' in self._legacy:
+            self.history = [links.linked(entry) for entry in self.history]
+            self.storage.rewrite_history(self.history)
+        self._legacy.clear()
+        return True
+
+    def _archive_history(self, before):
+        """Przenosi do archiwum wpisy sprzed daty `before`. Wywoływane pod blokadą magazynu; zwraca liczbę wpisów."""
+        # Historia dopisywana jest chronologicznie - granica wyszukiwana binarnie po dacie
+        count = bisect_left(self.history, before.isoformat(), key=_entry_date)
+        if not count:
+            return 0
+        self.storage.archive_history(count)
+        self.history = self.history[count:]
+        return count
+
+    def _rebuild_history_views(self):
+        self.reports = ReportAggregates.rebuild(self.history)
+        # Sumy wpisów z archiwum - raport bez zakresu dat obejmuje całą historię
+        self.archived_reports = self.storage.history_archive.summary()
+        self.history_index = HistoryIndex(self.history)
+
+    # --- Zmiany z innych procesów ---
+    def _changed_collections(self, stored):
+        return [
+            name for name in ('games', 'clients', 'rentals', 'history', HISTORY_CLEARED)
+            if stored.get(name, 0) != self.stored_versions.get(name, 0)
+        ]
+
+    @timed('datastore.reload_changed')
+    def _reload_changed(self):
+        """Wczytuje kolekcje zmienione na dysku przez inny proces. Wywoływane pod blokadą magazynu."""
+        stored = self.storage.read_versions()
+        changed = self._changed_collections(stored)
+        if not changed:
+            return
+        if 'games' in changed:
+            self._load_games()
+            self._game_search = None
+        if 'clients' in changed:
+            self._load_clients()
+            self._client_search = None
+        if 'rentals' in changed:
+            self._load_rentals()
+        if 'games' in changed or 'rentals' in changed:
+            self._assign_legacy_copies()
+        if HISTORY_CLEARED in changed:
+            self._load_history()
+        elif 'history' in changed:
+            # Historia tylko rośnie - wystarczy doczytać nowe wpisy
+            for entry in self.storage.read_history_since(len(self.history)):
+                self._history_appended(entry)
+        if self._migrate_legacy_records():
+            stored = self.storage.read_versions()
+        if HISTORY_CLEARED in changed:
+            self._rebuild_history_views()
+        if {'games', 'clients', 'rentals'} & set(changed):
+            self.index = DataIndex(self.games, self.clients, self.rentals)
+        self.stored_versions = stored
+        self._commit(*(name for name in changed if name != HISTORY_CLEARED))
+
+    def refresh(self):
+        """Wczytuje zmiany zapisane przez inne procesy. Zwykle tylko odczyt znaczników wersji."""
+        if not self._changed_collections(self.storage.read_versions()):
+            return
+        with self._writing():
+            pass
+
+    @contextmanager
+    def _writing(self):
+        """Zmiana danych: blokada procesu i magazynu, aktualne dane na starcie, nowe znaczniki na końcu."""
+        with self._lock, self.storage.transaction():
+            self._reload_changed()
+            yield
+            self.stored_versions = self.storage.read_versions()
+
+    def _assign_legacy_copies(self):
+        """Stare wypożyczenia (sprzed modelu egzemplarzy) dostają wypożyczony egzemplarz swojej gry."""
+        taken = {rental['Egzemplarz'] for rental in self.rentals if rental.get('Egzemplarz')}
+        titles = {game['Nazwa Gry']: game for game in self.games}
+        for rental in self.rentals:
+            if rental.get('Egzemplarz') or rental.get('Tytuł Gry') not in titles:
+                continue
+            for copy in titles[rental['Tytuł Gry']]['Egzemplarze']:
+                if not copy['Dostępny'] and copy['ID'] not in taken:
+                    rental['Egzemplarz'] = copy['ID']
+                    taken.add(copy['ID'])
+                    break
+
+    def _commit(self, *collections):
+        for name in collections:
+            self.versions[name] += 1
+        self.version += 1
+
+    def snapshot(self, name):
+        """Zwraca spójną parę (wersja kolekcji, dane kolekcji)."""
+        with self._lock:
+            return self.versions[name], getattr(self, name)
+
+    # --- Wyszukiwanie (przez indeksy) ---
+    def find_game(self, title):
+        position = self.index.game_positions.get(title)
+        return None if position is None else self.games[position]
+
+    def find_game_by_id(self, game_id):
+        position = self.index.game_positions_by_id.get(game_id)
+        return None if position is None else self.games[position]
+
+    def game_for_copy(self, copy_id):
+        """Gra, do której należy egzemplarz (lub None)."""
+        return self.find_game_by_id(self.index.copy_games.get(copy_id))
+
+    def find_client(self, client_id):
+        position = self.index.client_positions.get(client_id)
+        return None if position is None else self.clients[position]
+
+    def find_client_by_phone(self, phone):
+        position = self.index.client_positions_by_phone.get(phone)
+        return None if position is None else self.clients[position]
+
+    def find_client_by_label(self, label):
+        """Klient o etykiecie 'Imię Nazwisko (Telefon)' (lub None)."""
+        position = self.index.client_positions_by_label.get(label)
+        return None if position is None else self.clients[position]
+
+    def rented_games(self):
+        """Aktywne wypożyczenia istniejących, zajętych egzemplarzy - koszt zależy tylko od liczby wypożyczeń."""
+        rented = []
+        for rental in self.rentals:
+            copy_id = rental.get('Egzemplarz')
+            game_id = self.index.copy_games.get(copy_id)
+            if game_id is not None and copy_id not in self.index.free_copies.get(game_id, {}):
+                rented.append(rental)
+        return rented
+
+    def available_count(self, title):
+        """Liczba wolnych egzemplarzy gry - odczyt z indeksu."""
+        game = self.find_game(title)
+        return 0 if game is None else self.index.available_count(game[GAME_ID])
+
+    def rentals_for_client(self, client_id):
+        return list(self.index.rentals_by_client.get(client_id, []))
+
+    def client_history(self, client_id):
+        """Wpisy historii klienta (od najstarszych) - odczyt z indeksu, bez przeglądania całej historii."""
+        with self._lock:
+            return [self.history[position] for position in self.history_index.by_client.get(client_id, [])]
+
+    def game_history(self, game_id):
+        """Wpisy historii gry (od najstarszych) - odczyt z indeksu."""
+        with self._lock:
+            return [self.history[position] for position in self.history_index.by_game.get(game_id, [])]
+
+    # --- Wyszukiwanie pełnotekstowe ---
+    @staticmethod
+    def _client_search_text(client):
+        return f"{client['Imię']} {client['Nazwisko']} {client['Telefon']}"
+
+    def search_games(self, query, limit=None):
+        """Pozycje gier (na liście `games`) pasujących do zapytania, od najlepszych."""
+        with self._lock:
+            if self._game_search is None:
+                self._game_search = SearchIndex(game['Nazwa Gry'] for game in self.games)
+            return self._game_search.search(query, limit)
+
+    def search_clients(self, query, limit=None):
+        """Pozycje klientów pasujących do zapytania (imię, nazwisko, telefon)."""
+        with self._lock:
+            if self._client_search is None:
+                self._client_search = SearchIndex(self._client_search_text(c) for c in self.clients)
+            return self._client_search.search(query, limit)
+
+    def search_client_ids(self, query, limit=None):
+        """ID klientów pasujących do zapytania, od najlepszych."""
+        with self._lock:
+            clients = self.clients
+            return [clients[p][CLIENT_ID] for p in self.search_clients(query, limit) if p < len(clients)]
+
+    def search_available_games(self, query, limit):
+        """Tytuły dostępnych gier pasujących do zapytania."""
+        with self._lock:
+            games = self.games
+            titles = [games[p]['Nazwa Gry'] for p in self.search_games(query) if games[p].get('Dostępna', True)]
+        return titles[:limit]
+
+    def report_rows(self, entries=None):
+        """Spójna kopia sum raportowych całej historii, także archiwum (dzienne, miesięczne, na grę, łącznie).
+
+        Z `entries` sumy liczone są od nowa z podanych wpisów (np. zakresu dat sięgającego archiwum).
+        """
+        reports = None if entries is None else ReportAggregates.rebuild(entries)
+        with self._lock:
+            reports = reports or ReportAggregates().merge(self.archived_reports).merge(self.reports)
+            current_titles = {game[GAME_ID]: game['Nazwa Gry'] for game in self.games}
+            return {
+                'daily': reports.daily_rows(),
+                'monthly': reports.monthly_rows(),
+                'games': reports.game_rows(current_titles),
+                'totals': dict(reports.totals),
+            }
+
+    # --- Archiwum historii ---
+    def archived_months(self):
+        """Miesiące ('RRRR-MM') przeniesione do archiwum, od najstarszego."""
+        return self.storage.history_archive.months()
+
+    def reaches_archive(self, date_from, date_to=None):
+        """Czy zakres dat sięga przed bieżące okno historii (do archiwum).
+
+        Zakres bez daty 'od', ale z datą 'do' obejmuje najstarsze wpisy, więc zawsze sięga do archiwum.
+        """
+        months = self.archived_months()
+        if not months:
+            return False
+        if date_from is None:
+            return date_to is not None
+        return date_from.isoformat()[:7] <= months[-1]
+
+    def archived_history(self, date_from=None, date_to=None):
+        """Wpisy z archiwum z zakresu dat, od najstarszych - czytane leniwie, tylko z plików miesięcy z zakresu."""
+        history = self.history
+        # Wpisy sprzed pierwszego wpisu bieżącej historii (po przerwanej archiwizacji część wpisów jest w obu miejscach)
+        boundary = _entry_date(history[0]) if history else None
+        for entry in self.storage.history_archive.iter_entries(date_from, date_to):
+            if boundary is None or _entry_date(entry) < boundary:
+                yield entry
+
+    def export_source(self, collection):
+        """Rekordy kolekcji do eksportu. Historia obejmuje też archiwum (czytane strumieniowo)."""
+        records = getattr(self, collection)
+        if collection == 'history':
+            # Historia rośnie w miejscu - eksport obejmuje wpisy z chwili jego rozpoczęcia
+            return itertools.chain(self.archived_history(), itertools.islice(records, len(records)))
+        return records
+
+    def _history_appended(self, history_entry):
+        # Historia tylko rośnie - dopisanie w miejscu jest bezpieczne dla czytających sesji
+        self.history.append(history_entry)
+        self.reports.add(history_entry)
+        self.history_index.add(history_entry, len(self.history) - 1)
+
+    def _set_copy_available(self, game_id, copy_id, available):
+        """Zwraca nową listę gier ze zmienionym stanem jednego egzemplarza."""
+        position = self.index.game_positions_by_id[game_id]
+        games = list(self.games)
+        games[position] = with_copy_status(games[position], copy_id, available)
+        return games
+
+    def _relabel_rentals(self, key, record_id, changes):
+        """Zwraca listę wypożyczeń z uaktualnionym opisem ('Klient'/'Tytuł Gry') dla klienta lub gry o danym ID."""
+        return [dict(rental, **changes) if rental.get(key) == record_id else rental for rental in self.rentals]
+
+    def _rentals_relabeled(self, rentals):
+        """Przyjmuje listę z `_relabel_rentals` i podmienia w indeksie tylko zmienione rekordy."""
+        for old, new in zip(self.rentals, rentals):
+            if new is not old:
+                self.index.rental_replaced(old, new)
+        self.rentals = rentals
+
+    # --- Wypożyczenia ---
+    @timed('datastore.register_rental')
+    def register_rental(self, rental, history_entry, copy_id=None):
+        """Rejestruje wypożyczenie wolnego egzemplarza (wskazanego lub dowolnego) i zwraca zapisany rekord.
+
+        Rekord dostaje 'ID wypożyczenia', 'ID gry' i 'Egzemplarz' (te same ID trafiają do wpisu historii).
+        Zgłasza DataConflictError, jeśli nie ma wolnego egzemplarza (np. wypożyczono go w innej sesji).
+        """
+        with self._writing():
+            title = rental['Tytuł Gry']
+            game = self.find_game(title)
+            if game is None:
+                raise DataConflictError(f"Gra '{title}' nie istnieje.")
+            game_id = game[GAME_ID]
+            taken_copy_id = self.index.take_copy(game_id, copy_id)
+            if taken_copy_id is None:
+                if copy_id is not None:
+                    raise DataConflictError(f"Egzemplarz {copy_id} gry '{title}' nie jest dostępny.")
+                raise DataConflictError(f"Wszystkie egzemplarze gry '{title}' zostały już wypożyczone.")
+            links = {RENTAL_ID: new_id(), GAME_ID: game_id, CLIENT_ID: rental.get(CLIENT_ID)}
+            rental = dict(rental, **links, **{'Egzemplarz': taken_copy_id})
+            history_entry = dict(history_entry, **links)
+            games = self._set_copy_available(game_id, taken_copy_id, False)
+            rentals = self.rentals + [rental]
+            try:
+                with self.storage.transaction():
+                    self.storage.save_changes('rentals', rentals, changed=[rental])
+                    self.storage.save_changes('games', games, changed=[games[self.index.game_positions_by_id[game_id]]])
+                    self.storage.append_history(history_entry)
+            except BaseException:
+                self.index.release_copy(game_id, taken_copy_id)
+                raise
+            self.games, self.rentals = games, rentals
+            self.index.rental_added(rental)
+            self._history_appended(history_entry)
+            self._commit('games', 'rentals', 'history')
+            return rental
+
+    @timed('datastore.return_rental')
+    def return_rental(self, rental, history_entry):
+        """Rejestruje zwrot. Zgłasza DataConflictError, jeśli wypożyczenie zostało już zwrócone w innej sesji."""
+        with self._writing():
+            current = self.index.rental_by_id.get(rental.get(RENTAL_ID))
+            if current is None:
+                raise DataConflictError(f"Wypożyczenie gry '{rental['Tytuł Gry']}' zostało już zwrócone.")
+            rentals = [r for r in self.rentals if r is not current]
+            copy_id = current.get('Egzemplarz')
+            # Gra z indeksu egzemplarzy - po ID, więc także po zmianie nazwy gry
+            game_id = self.index.copy_games.get(copy_id)
+            game_exists = game_id in self.index.game_positions_by_id
+            games = self._set_copy_available(game_id, copy_id, True) if game_exists else self.games
+            history_entry = dict(history_entry, **{key: current.get(key) for key in (RENTAL_ID, CLIENT_ID, GAME_ID)})
+            with self.storage.transaction():
+                self.storage.save_changes('rentals', rentals, removed=[current[RENTAL_ID]])
+                if game_exists:
+                    self.storage.save_changes('games', games, changed=[games[self.index.game_positions_by_id[game_id]]])
+                self.storage.append_history(history_entry)
+            self.games, self.rentals = games, rentals
+            self.index.rental_removed(current)
+            if game_exists:
+                self.index.release_copy(game_id, copy_id)
+            self._history_appended(history_entry)
+            self._commit('games', 'rentals', 'history')
+
+    # --- Gry ---
+    def add_game(self, name, copies=1):
+        with self._writing():
+            if name in self.index.game_positions:
+                raise DataConflictError("Gra o tej nazwie już istnieje.")
+            game = with_copies({GAME_ID: new_id(), 'Nazwa Gry': name, 'Dostępna': True, 'Liczba egzemplarzy': copies}, self.copy_ids)
+            games = self.games + [game]
+            self.storage.save_changes('games', games, changed=[game])
+            self.games = games
+            self.index.game_added(game, len(games) - 1)
+            if self._game_search is not None:
+                self._game_search.add(name)
+            self._commit('games')
+
+    def add_games_bulk(self, new_games):
+        """Dodaje wiele gier jednym zapisem. Gry o istniejących nazwach są pomijane; zwraca liczbę dodanych."""
+        with self._writing():
+            games = list(self.games)
+            added = []
+            # Tytuły dodane w tej partii - indeks zmieniany dopiero po udanym zapisie
+            seen = set()
+            for game in new_games:
+                if game['Nazwa Gry'] in self.index.game_positions or game['Nazwa Gry'] in seen:
+                    continue
+                seen.add(game['Nazwa Gry'])
+                game = with_id(with_copies(game, self.copy_ids), GAME_ID)
+                games.append(game)
+                added.append(game)
+            if not added:
+                return 0
+            self.storage.save_changes('games', games, changed=added)
+            self.games = games
+            for position, game in enumerate(added, start=len(games) - len(added)):
+                self.index.game_added(game, position)
+            if self._game_search is not None:
+                for game in added:
+                    self._game_search.add(game['Nazwa Gry'])
+            self._commit('games')
+            return len(added)
+
+    def rename_game(self, old_name, new_name):
+        """Zmienia tytuł gry. Aktywne wypożyczenia wskazują grę po ID - uaktualniany jest tylko ich opis."""
+        with self._writing():
+            position = self.index.game_positions.get(old_name)
+            if position is None or new_name == old_name:
+                return
+            if new_name in self.index.game_positions:
+                raise DataConflictError("Gra o tej nazwie już istnieje.")
+            games = list(self.games)
+            games[position] = dict(games[position], **{'Nazwa Gry': new_name})
+            rentals = self._relabel_rentals(GAME_ID, games[position][GAME_ID], {'Tytuł Gry': new_name})
+            relabeled = [r for r in rentals if r.get(GAME_ID) == games[position][GAME_ID]]
+            with self.storage.transaction():
+                self.storage.save_changes('games', games, changed=[games[position]])
+                if relabeled:
+                    self.storage.save_changes('rentals', rentals, changed=relabeled)
+            self.games = games
+            self.index.game_renamed(old_name, new_name, position)
+            self._rentals_relabeled(rentals)
+            if self._game_search is not None:
+                self._game_search.update(position, new_name)
+            self._commit('games', 'rentals')
+
+    def set_copy_count(self, title, count):
+        """Zmienia liczbę egzemplarzy gry. Zgłasza DataConflictError, gdy trzeba by usunąć wypożyczony egzemplarz."""
+        with self._writing():
+            position = self.index.game_positions.get(title)
+            if position is None:
+                return
+            try:
+                game = with_copy_count(self.games[position], count, self.copy_ids)
+            except ValueError as e:
+                raise DataConflictError(str(e)) from e
+            games = list(self.games)
+            games[position] = game
+            self.storage.save_changes('games', games, changed=[game])
+            self.games = games
+            self.index.game_copies_changed(game)
+            self._commit('games')
+
+    def delete_game(self, name):
+        with self._writing():
+            games = [game for game in self.games if game['Nazwa Gry'] != name]
+            removed = [game[GAME_ID] for game in self.games if game['Nazwa Gry'] == name]
+            if not removed:
+                return
+            self.storage.save_changes('games', games, removed=removed)
+            # Od końca, żeby przesunięcie pozycji nie dotyczyło gier jeszcze do usunięcia
+            for position in reversed(range(len(self.games))):
+                if self.games[position]['Nazwa Gry'] == name:
+                    self.index.game_removed(self.games[position], position)
+            self.games = games
+            self._game_search = None
+            self._commit('games')
+
+    # --- Klienci ---
+    def add_client(self, client):
+        """Dodaje klienta i zwraca jego ID."""
+        with self._writing():
+            client = with_id(client, CLIENT_ID)
+            clients = self.clients + [client]
+            self.storage.save_changes('clients', clients, changed=[client])
+            self.clients = clients
+            self.index.client_added(client, len(clients) - 1)
+            if self._client_search is not None:
+                self._client_search.add(self._client_search_text(client))
+            self._commit('clients')
+            return client[CLIENT_ID]
+
+    def add_clients_bulk(self, new_clients):
+        """Dodaje wielu klientów jednym zapisem. Numery telefonów już obecne są pomijane; zwraca liczbę dodanych."""
+        with self._writing():
+            clients = list(self.clients)
+            added = []
+            # Telefony dodane w tej partii - indeks zmieniany dopiero po udanym zapisie
+            seen = set()
+            for client in new_clients:
+                if client['Telefon'] in self.index.client_positions_by_phone or client['Telefon'] in seen:
+                    continue
+                seen.add(client['Telefon'])
+                client = with_id(client, CLIENT_ID)
+                clients.append(client)
+                added.append(client)
+            if not added:
+                return 0
+            self.storage.save_changes('clients', clients, changed=added)
+            self.clients = clients
+            for position, client in enumerate(added, start=len(clients) - len(added)):
+                self.index.client_added(client, position)
+            if self._client_search is not None:
+                for client in added:
+                    self._client_search.add(self._client_search_text(client))
+            self._commit('clients')
+            return len(added)
+
+    def update_client(self, client_id, changes):
+        """Aktualizuje dane klienta. Jego aktywne wypożyczenia (powiązane po ID) dostają nowy opis 'Klient'."""
+        with self._writing():
+            position = self.index.client_positions.get(client_id)
+            if position is None:
+                return
+            clients = list(self.clients)
+            clients[position] = dict(clients[position], **changes, **{CLIENT_ID: client_id})
+            rentals = self.rentals
+            if client_id in self.index.rentals_by_client:
+                rentals = self._relabel_rentals(CLIENT_ID, client_id, {'Klient': client_label(clients[position])})
+            with self.storage.transaction():
+                self.storage.save_changes('clients', clients, changed=[clients[position]])
+                if rentals is not self.rentals:
+                    self.storage.save_changes('rentals', rentals, changed=[r for r in rentals if r.get(CLIENT_ID) == client_id])
+            self.index.client_updated(self.clients[position], clients[position], position)
+            self.clients = clients
+            if self._client_search is not None:
+                self._client_search.update(position, self._client_search_text(clients[position]))
+            if rentals is self.rentals:
+                self._commit('clients')
+                return
+            self._rentals_relabeled(rentals)
+            self._commit('clients', 'rentals')
+
+    def delete_client(self, client_id):
+        with self._writing():
+            if client_id not in self.index.client_positions:
+                return
+            position = self.index.client_positions[client_id]
+            clients = self.clients[:position] + self.clients[position + 1:]
+            self.storage.save_changes('clients', clients, removed=[client_id])
+            self.index.client_removed(self.clients[position], position)
+            self.clients = clients
+            self._client_search = None
+            self._commit('clients')
+
+    # --- Historia ---
+    def archive_history(self, before):
+        """Przenosi wpisy historii sprzed daty `before` do archiwum. Zwraca liczbę przeniesionych wpisów."""
+        with self._writing():
+            count = self._archive_history(before)
+            if count:
+                self._rebuild_history_views()
+                self._commit('history')
+            return count
+
+    def clear_history(self):
+        with self._writing():
+            self.storage.clear_history()
+            self.history = []
+            self._rebuild_history_views()
+            self._commit('history')
@@ -0,0 +1,174 @@
+import gzip
+import json
+import os
+from datetime import date, timedelta
+
+from reports import ReportAggregates
+
+# Komentarz: Archiwum starej historii. Wpisy starsze niż horyzont przechowywania
+# (BORROW_APP_HISTORY_RETENTION_DAYS, domyślnie rok) przenoszone są z bieżącej historii
+# do skompresowanych plików JSON-lines - jeden plik na miesiąc ('history_2024-05.jsonl.gz').
+# W pamięci zostaje tylko bieżące okno; archiwum czytane jest dopiero wtedy, gdy ekran
+# historii lub raportów pyta o zakres dat sięgający przed to okno, i to tylko pliki
+# miesięcy z tego zakresu.
+#
+# Sumy raportowe zarchiwizowanych wpisów trzymane są w 'summary.json' razem z rozmiarem
+# i czasem zapisu każdego pliku miesiąca. Jeśli pliki nie zgadzają się z zapisanymi
+# (np. awaria między zapisem miesiąca a sum), sumy są liczone od nowa z archiwum.
+
+ARCHIVE_PREFIX = 'history_'
+ARCHIVE_SUFFIX = '.jsonl.gz'
+SUMMARY_FILE = 'summary.json'
+DEFAULT_RETENTION_DAYS = 365
+# Miesiąc dla wpisów bez daty
+UNKNOWN_MONTH = '0000-00'
+
+
+def retention_days_from_env(value=None):
+    """Horyzont przechowywania historii w dniach z ustawienia BORROW_APP_HISTORY_RETENTION_DAYS.
+
+    Puste ustawienie oznacza wartość domyślną, '0' wyłącza archiwizację (zwraca None).
+    """
+    value = os.environ.get('BORROW_APP_HISTORY_RETENTION_DAYS', '') if value is None else value
+    try:
+        days = int(value) if value else DEFAULT_RETENTION_DAYS
+    except ValueError:
+        days = DEFAULT_RETENTION_DAYS
+    return days if days > 0 else None
+
+
+def retention_cutoff(days, today=None):
+    """Pierwszy dzień, którego wpisy zostają w bieżącej historii."""
+    return (today or date.today()) - timedelta(days=days)
+
+
+def entry_month(entry):
+    return str(entry.get('Data', ''))[:7] or UNKNOWN_MONTH
+
+
+class HistoryArchive:
+    """Skompresowane pliki miesięczne ze starymi wpisami historii (w kolejności zdarzeń)."""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _path(self, month):
+        return os.path.join(self.directory, f"{ARCHIVE_PREFIX}{month}{ARCHIVE_SUFFIX}")
+
+    def months(self):
+        """Zarchiwizowane miesiące ('RRRR-MM'), od najstarszego."""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            name[len(ARCHIVE_PREFIX):-len(ARCHIVE_SUFFIX)]
+            for name in os.listdir(self.directory)
+            if name.startswith(ARCHIVE_PREFIX) and name.endswith(ARCHIVE_SUFFIX)
+        )
+
+    def _stamps(self):
+        """Miesiąc -> [rozmiar, czas zapisu] pliku; zmiana oznacza nieaktualne sumy."""
+        stamps = {}
+        for month in self.months():
+            stat = os.stat(self._path(month))
+            stamps[month] = [stat.st_size, stat.st_mtime_ns]
+        return stamps
+
+    def summary(self):
+        """Sumy raportowe (ReportAggregates) wszystkich zarchiwizowanych wpisów."""
+        if not self.months():
+            return ReportAggregates()
+        try:
+            with open(os.path.join(self.directory, SUMMARY_FILE), 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+            if stored.get('stamps') == self._stamps():
+                return ReportAggregates.from_dict(stored['reports'])
+        except (OSError, ValueError, KeyError):
+            pass
+        aggregates = ReportAggregates.rebuild(self.iter_entries())
+        self._write_summary(aggregates)
+        return aggregates
+
+    def _write_summary(self, aggregates):
+        path = os.path.join(self.directory, SUMMARY_FILE)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'stamps': self._stamps(), 'reports': aggregates.to_dict()}, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _read_lines(self, month):
+        path = self._path(month)
+        if not os.path.exists(path):
+            return []
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            return [line.rstrip('\n') for line in f if line.strip()]
+
+    def add(self, entries):
+        """Dopisuje wpisy do plików ich miesięcy. Zwraca liczbę miesięcy, których pliki zmieniono.
+
+        Każdy plik miesiąca zapisywany jest obok i podmieniany atomowo. Wpis już obecny
+        w pliku nie jest dopisywany drugi raz, więc ponowienie przerwanej archiwizacji
+        (awaria przed usunięciem wpisów z bieżącej historii) nie dubluje archiwum.
+        Przy kilku procesach wywołujący musi zapewnić wyłączność (blokada magazynu).
+        Sumy raportowe archiwum zapisywane są po plikach miesięcy.
+        """
+        by_month = {}
+        for entry in entries:
+            by_month.setdefault(entry_month(entry), []).append(json.dumps(entry, ensure_ascii=False))
+        if not by_month:
+            return 0
+        os.makedirs(self.directory, exist_ok=True)
+        aggregates = self.summary()
+        for month, lines in by_month.items():
+            existing = self._read_lines(month)
+            present = set(existing)
+            added = [line for line in lines if line not in present]
+            target = self._path(month)
+            tmp_path = target + '.tmp'
+            with open(tmp_path, 'wb') as raw:
+                with gzip.GzipFile(fileobj=raw, mode='wb') as f:
+                    for line in existing + added:
+                        f.write((line + '\n').encode('utf-8'))
+                raw.flush()
+                os.fsync(raw.fileno())
+            os.replace(tmp_path, target)
+            for line in added:
+                aggregates.add(json.loads(line))
+        self._write_summary(aggregates)
+        return len(by_month)
+
+    def iter_entries(self, date_from=None, date_to=None):
+        """Wpisy z zakresu dat (włącznie), od najstarszych. Otwierane są tylko pliki miesięcy z zakresu."""
+        low = date_from.isoformat() if date_from else ''
+        # Cały dzień 'do' włącznie
+        high = date_to.isoformat() + ' 99' if date_to else None
+        for month in self.months():
+            if (date_from and month < low[:7]) or (date_to and month > high[:7]):
+                continue
+            for line in self._read_lines(month):
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                day = str(entry.get('Data', ''))
+                if day >= low and (high is None or day <= high):
+                    yield entry
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from data_store import DataStore
+    from storage import open_storage
+
+    parser = argparse.ArgumentParser(description="Przeniesienie starej historii do archiwum (pliki miesięczne .jsonl.gz).")
+    parser.add_argument('--backend', default=os.environ.get('BORROW_APP_STORAGE', 'sqlite'), choices=['sqlite', 'json'])
+    parser.add_argument('--days', type=int, default=retention_days_from_env() or DEFAULT_RETENTION_DAYS,
+                        help="Wpisy starsze niż tyle dni trafiają do archiwum")
+    args = parser.parse_args()
+
+    data_store = DataStore(open_storage(args.backend))
+    cutoff = retention_cutoff(args.days)
+    count = data_store.archive_history(cutoff)
+    print(f"Przeniesiono do archiwum: {count} (wpisy sprzed {cutoff}); miesiące w archiwum: {len(data_store.archived_months())}")
@@ -0,0 +1,211 @@
+import json
+import os
+
+# Komentarz: Historia jest przechowywana jako dziennik JSON-lines (jeden wpis w linii).
+# Każde zdarzenie dopisuje tylko jedną linię, więc koszt zapisu nie zależy od długości historii.
+
+SEGMENT_PREFIX = 'segment_'
+SEGMENT_SUFFIX = '.jsonl'
+TMP_SUFFIX = '.tmp'
+
+
+class HistoryLog:
+    """Dziennik historii w trybie 'tylko dopisywanie', podzielony na segmenty.
+
+    Aktywny jest zawsze ostatni segment. Po przekroczeniu `segment_max_records` wpisów
+    zaczynany jest nowy segment, a gdy zamkniętych segmentów jest więcej niż
+    `max_sealed_segments`, są one scalane (kompaktowane) w jeden plik.
+
+    Segment scalony z segmentów o numerach od `a` do `b` ma w nazwie oba numery
+    ('segment_000001-000005.jsonl') i zastępuje je w odczycie, nawet jeśli awaria
+    przerwała usuwanie starych plików. Pozostałości usuwa najbliższy zapis.
+    """
+
+    def __init__(self, directory, segment_max_records=5000, max_sealed_segments=8):
+        self.directory = directory
+        self.segment_max_records = segment_max_records
+        self.max_sealed_segments = max_sealed_segments
+        os.makedirs(self.directory, exist_ok=True)
+        self._active_path = None
+        self._active_count = 0
+
+    # --- Segmenty ---
+    def _segment_path(self, first, last=None):
+        if last is None or last == first:
+            return os.path.join(self.directory, f"{SEGMENT_PREFIX}{first:06d}{SEGMENT_SUFFIX}")
+        return os.path.join(self.directory, f"{SEGMENT_PREFIX}{first:06d}-{last:06d}{SEGMENT_SUFFIX}")
+
+    def _segment_files(self):
+        """Wszystkie segmenty na dysku jako (pierwszy, ostatni) numer - także te już zastąpione."""
+        found = []
+        for name in os.listdir(self.directory):
+            if not (name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)):
+                continue
+            numbers = name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)].split('-')
+            try:
+                first, last = int(numbers[0]), int(numbers[-1])
+            except ValueError:
+                continue
+            if len(numbers) <= 2 and first <= last:
+                found.append((first, last))
+        return found
+
+    def _segments(self):
+        """Aktualne segmenty (pierwszy, ostatni numer) w kolejności; zastąpione przez scalony plik są pomijane."""
+        segments = []
+        # Przy tym samym początku najpierw najszerszy zakres - scalony plik wygrywa ze swoimi źródłami
+        for first, last in sorted(self._segment_files(), key=lambda s: (s[0], -s[1])):
+            if segments and first <= segments[-1][1]:
+                continue
+            segments.append((first, last))
+        return segments
+
+    def _remove_superseded(self):
+        """Usuwa pliki zastąpione przez segment scalony (i pliki tymczasowe) po przerwanym scalaniu.
+
+        Wywoływane tylko przy zapisie, pod blokadą magazynu.
+        """
+        current = set(self._segments())
+        for segment in self._segment_files():
+            if segment not in current:
+                os.remove(self._segment_path(*segment))
+        for name in os.listdir(self.directory):
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX + TMP_SUFFIX):
+                os.remove(os.path.join(self.directory, name))
+
+    def _open_active_segment(self):
+        """Ustala aktywny segment (ostatni na dysku) i liczbę jego wpisów."""
+        self._remove_superseded()
+        segments = self._segments()
+        if segments:
+            self._active_path = self._segment_path(*segments[-1])
+            self._active_count = len(self._read_segment(self._active_path))
+        else:
+            self._active_path = self._segment_path(1)
+            self._active_count = 0
+
+    def _rotate(self):
+        """Zamyka aktywny segment i zaczyna nowy; w razie potrzeby kompaktuje zamknięte segmenty."""
+        segments = self._segments()
+        next_number = (segments[-1][1] + 1) if segments else 1
+        self._active_path = self._segment_path(next_number)
+        self._active_count = 0
+        if len(segments) > self.max_sealed_segments:
+            self.compact()
+
+    def _write_merged(self, segment, entries):
+        """Zapisuje wpisy jako segment (pierwszy, ostatni): plik tymczasowy obok, fsync i atomowa podmiana."""
+        target = self._segment_path(*segment)
+        tmp_path = target + TMP_SUFFIX
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, target)
+
+    @staticmethod
+    def _iter_segment(path):
+        """Czyta jeden segment linia po linii. Uszkodzona (np. urwana przy awarii) linia jest pomijana."""
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+    @classmethod
+    def _read_segment(cls, path):
+        return list(cls._iter_segment(path))
+
+    # --- Operacje publiczne ---
+    def append(self, entry):
+        """Dopisuje jeden wpis na końcu dziennika i wymusza zapis na dysk (fsync).
+
+        Przy kilku procesach wywołujący musi zapewnić wyłączność (blokada magazynu).
+        """
+        segments = self._segments()
+        # Inny proces mógł w międzyczasie zacząć nowy segment albo scalić segmenty
+        if self._active_path is None or (segments and self._segment_path(*segments[-1]) != self._active_path):
+            self._open_active_segment()
+        if self._active_count >= self.segment_max_records:
+            self._rotate()
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+        with open(self._active_path, 'a', encoding='utf-8') as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        self._active_count += 1
+
+    def iter_entries(self):
+        """Zwraca wpisy historii po kolei, bez wczytywania całego dziennika do pamięci."""
+        for segment in self._segments():
+            yield from self._iter_segment(self._segment_path(*segment))
+
+    def read_all(self):
+        """Zwraca wszystkie wpisy historii w kolejności dopisywania."""
+        return list(self.iter_entries())
+
+    def compact(self):
+        """Scala wszystkie zamknięte segmenty (poza aktywnym) w jeden segment.
+
+        Scalony plik ma w nazwie zakres numerów segmentów, które zastępuje. Jest zapisywany
+        obok i podmieniany atomowo, a dopiero potem usuwane są segmenty źródłowe. Awaria
+        w dowolnym momencie nie powoduje ani utraty, ani podwojenia wpisów w odczycie.
+        """
+        if self._active_path is None:
+            self._open_active_segment()
+        sealed = [s for s in self._segments() if self._segment_path(*s) != self._active_path]
+        if len(sealed) < 2:
+            return
+        entries = []
+        for segment in sealed:
+            entries.extend(self._read_segment(self._segment_path(*segment)))
+        self._write_merged((sealed[0][0], sealed[-1][1]), entries)
+        self._remove_superseded()
+
+    def rewrite(self, entries):
+        """Zastępuje cały dziennik podanymi wpisami (np. przy migracji formatu wpisów).
+
+        Jak przy kompaktowaniu: nowy segment obejmuje zakres numerów wszystkich dotychczasowych
+        i jest podmieniany atomowo, dopiero potem usuwane są pozostałe segmenty.
+        """
+        segments = self._segments()
+        merged = (segments[0][0], segments[-1][1]) if segments else (1, 1)
+        self._write_merged(merged, entries)
+        self._remove_superseded()
+        self._active_path = None
+
+    def clear(self):
+        """Usuwa wszystkie segmenty dziennika."""
+        for segment in self._segment_files():
+            os.remove(self._segment_path(*segment))
+        self._active_path = self._segment_path(1)
+        self._active_count = 0
+
+    def migrate_from_json(self, json_path):
+        """Jednorazowa migracja ze starego pliku history.json (tablica JSON).
+
+        Wpisy są przepisywane do dziennika, a stary plik zmienia nazwę na *.migrated,
+        dzięki czemu migracja nie wykona się ponownie. Przy kilku procesach wywołujący
+        musi zapewnić wyłączność (blokada magazynu).
+        """
+        if not os.path.exists(json_path) or self._segment_files():
+            return 0
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                old_entries = json.load(f)
+        except json.JSONDecodeError:
+            old_entries = []
+        if not isinstance(old_entries, list):
+            old_entries = []
+        old_entries = [entry for entry in old_entries if entry]
+        if old_entries:
+            # Atomowo: przerwany zapis nie zostawia częściowego segmentu, który blokowałby ponowną migrację
+            self._write_merged((1, 1), old_entries)
+        os.replace(json_path, json_path + '.migrated')
+        self._active_path = None
+        return len(old_entries)
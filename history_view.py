@@ -0,0 +1,48 @@
+from bisect import bisect_left, bisect_right
+
+# Komentarz: Filtrowanie i stronicowanie historii odbywa się na liście wpisów,
+# zanim powstanie jakikolwiek DataFrame. Do przeglądarki trafia tylko jedna strona.
+
+EVENT_TYPES = ['Wypożyczenie', 'Zwrot']
+
+
+def _entry_date(entry):
+    return entry.get('Data', '')
+
+
+def filter_history(entries, date_from=None, date_to=None, event_type=None, client=None, game=None):
+    """Zwraca wpisy spełniające filtry, w kolejności chronologicznej.
+
+    Historia jest dopisywana chronologicznie, więc zakres dat wyznaczany jest
+    wyszukiwaniem binarnym po polu 'Data' ('RRRR-MM-DD GG:MM:SS'). Pozostałe filtry
+    (typ zdarzenia, fragment nazwy klienta lub gry, bez rozróżniania wielkości liter)
+    sprawdzane są tylko w obrębie tego zakresu.
+    """
+    low = 0
+    high = len(entries)
+    if date_from:
+        low = bisect_left(entries, date_from.isoformat(), key=_entry_date)
+    if date_to:
+        # Cały dzień 'do' włącznie
+        high = bisect_right(entries, date_to.isoformat() + ' 99', lo=low, key=_entry_date)
+    selected = entries[low:high]
+
+    client = client.casefold() if client else None
+    game = game.casefold() if game else None
+    if not (event_type or client or game):
+        return selected
+    return [
+        entry for entry in selected
+        if (not event_type or entry.get('Typ zdarzenia') == event_type)
+        and (not client or client in str(entry.get('Klient', '')).casefold())
+        and (not game or game in str(entry.get('Tytuł Gry', '')).casefold())
+    ]
+
+
+def history_page(entries, page, page_size):
+    """Zwraca stronę wpisów (numeracja od 1), od najnowszych, oraz liczbę stron."""
+    total_pages = max(1, -(-len(entries) // page_size))
+    page = min(max(1, page), total_pages)
+    end = len(entries) - (page - 1) * page_size
+    start = max(0, end - page_size)
+    return entries[start:end][::-1], total_pages
@@ -0,0 +1,32 @@
+import uuid
+
+# Komentarz: Stałe klucze rekordów. Gry, klienci i wypożyczenia mają własne ID, które
+# nie zmienia się przy zmianie nazwy gry czy danych klienta. Powiązania (wypożyczenie ->
+# klient i gra, wpis historii -> klient, gra i wypożyczenie) zapisywane są po ID, więc
+# wyszukuje się je w indeksach zamiast porównywać napisy. Pola 'Klient' i 'Tytuł Gry'
+# zostają jako czytelny opis: w aktywnych wypożyczeniach są aktualizowane przy zmianie
+# nazwy, a w historii pokazują stan z chwili zdarzenia.
+#
+# ID to losowy UUID (hex) - kilka procesów może tworzyć rekordy bez uzgadniania
+# wspólnego licznika, a ID usuniętego rekordu nigdy nie zostanie użyte ponownie.
+
+GAME_ID = 'ID gry'
+CLIENT_ID = 'ID klienta'
+RENTAL_ID = 'ID wypożyczenia'
+ID_KEYS = (RENTAL_ID, CLIENT_ID, GAME_ID)
+
+
+def new_id():
+    return uuid.uuid4().hex
+
+
+def with_id(record, key):
+    """Zwraca rekord z ID; rekord bez ID (sprzed migracji) jest kopiowany z nowym ID."""
+    if record.get(key):
+        return record
+    return dict(record, **{key: new_id()})
+
+
+def missing_ids(records, *keys):
+    """Czy któryś rekord nie ma jeszcze któregoś z kluczy (wymaga migracji)."""
+    return any(key not in record for record in records for key in keys)
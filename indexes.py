@@ -0,0 +1,211 @@
+from collections import defaultdict
+
+from identifiers import CLIENT_ID, GAME_ID, RENTAL_ID
+from inventory import COPIES_KEY
+
+# Komentarz: Indeksy w pamięci nad danymi z DataStore. Zamiast przeszukiwać listy
+# przy każdej akcji, DataStore aktualizuje indeksy przy każdej zmianie danych,
+# więc wyszukanie gry, klienta czy aktywnego wypożyczenia kosztuje O(1).
+# Powiązania między kolekcjami (egzemplarz -> gra, wypożyczenia klienta, historia
+# klienta i gry) są indeksowane po stałych ID, a nie po nazwach.
+
+
+def client_label(client):
+    """Etykieta 'Imię Nazwisko (Telefon)' pokazywana przy wyborze klienta i w wypożyczeniach."""
+    return f"{client['Imię']} {client['Nazwisko']} ({client['Telefon']})"
+
+
+def _replace_key(positions, old_key, new_key, position):
+    if old_key == new_key:
+        return
+    if positions.get(old_key) == position:
+        del positions[old_key]
+    positions.setdefault(new_key, position)
+
+
+def _shift_positions(positions, removed):
+    """Po usunięciu rekordu z pozycji `removed` pozycje dalszych rekordów maleją o jeden."""
+    for key, position in positions.items():
+        if position > removed:
+            positions[key] = position - 1
+
+
+class DataIndex:
+    def __init__(self, games, clients, rentals):
+        self.rebuild_games(games)
+        self.rebuild_clients(clients)
+        self.rebuild_rentals(rentals)
+
+    # --- Gry: tytuł/ID -> pozycja, ID gry -> wolne egzemplarze, egzemplarz -> ID gry ---
+    def rebuild_games(self, games):
+        self.game_positions = {}
+        self.game_positions_by_id = {}
+        # Słownik użyty jako uporządkowany zbiór - pobranie i zwolnienie egzemplarza w O(1)
+        self.free_copies = {}
+        self.copy_games = {}
+        # ID gry -> ID jej egzemplarzy, żeby przy zmianie liczby egzemplarzy usunąć z indeksu te, których już nie ma
+        self.game_copy_ids = {}
+        for position, game in enumerate(games):
+            self.game_added(game, position)
+
+    def game_added(self, game, position):
+        title = game['Nazwa Gry']
+        self.game_positions_by_id[game[GAME_ID]] = position
+        # Przy zdublowanych tytułach wygrywa pierwszy, tak jak w dotychczasowych pętlach
+        self.game_positions.setdefault(title, position)
+        self.game_copies_changed(game)
+
+    def game_copies_changed(self, game):
+        """Przelicza wolne egzemplarze jednej gry (np. po zmianie liczby egzemplarzy)."""
+        game_id = game[GAME_ID]
+        self.free_copies[game_id] = {copy['ID']: None for copy in game.get(COPIES_KEY, []) if copy['Dostępny']}
+        for copy_id in self.game_copy_ids.get(game_id, ()):
+            if self.copy_games.get(copy_id) == game_id:
+                del self.copy_games[copy_id]
+        copy_ids = [copy['ID'] for copy in game.get(COPIES_KEY, [])]
+        for copy_id in copy_ids:
+            self.copy_games[copy_id] = game_id
+        self.game_copy_ids[game_id] = copy_ids
+
+    def game_renamed(self, old_name, new_name, position):
+        # Egzemplarze i wypożyczenia wskazują grę po ID - zmienia się tylko klucz tytułu
+        if self.game_positions.get(old_name) == position:
+            del self.game_positions[old_name]
+        self.game_positions.setdefault(new_name, position)
+
+    def game_removed(self, game, position):
+        """Usuwa grę z indeksu; gry za nią przesuwają się o jedną pozycję."""
+        game_id = game[GAME_ID]
+        del self.game_positions_by_id[game_id]
+        if self.game_positions.get(game['Nazwa Gry']) == position:
+            del self.game_positions[game['Nazwa Gry']]
+        self.free_copies.pop(game_id, None)
+        for copy_id in self.game_copy_ids.pop(game_id, ()):
+            if self.copy_games.get(copy_id) == game_id:
+                del self.copy_games[copy_id]
+        _shift_positions(self.game_positions_by_id, position)
+        _shift_positions(self.game_positions, position)
+
+    def available_count(self, game_id):
+        return len(self.free_copies.get(game_id, ()))
+
+    def take_copy(self, game_id, copy_id=None):
+        """Zajmuje wskazany albo dowolny wolny egzemplarz gry; zwraca jego ID lub None."""
+        free = self.free_copies.get(game_id)
+        if not free:
+            return None
+        if copy_id is None:
+            copy_id, _ = free.popitem()
+        elif copy_id in free:
+            del free[copy_id]
+        else:
+            return None
+        return copy_id
+
+    def release_copy(self, game_id, copy_id):
+        self.free_copies.setdefault(game_id, {})[copy_id] = None
+
+    # --- Klienci: ID -> pozycja, telefon -> pozycja, etykieta -> pozycja ---
+    def rebuild_clients(self, clients):
+        self.client_positions = {}
+        self.client_positions_by_phone = {}
+        self.client_positions_by_label = {}
+        for position, client in enumerate(clients):
+            self.client_added(client, position)
+
+    def client_added(self, client, position):
+        self.client_positions[client[CLIENT_ID]] = position
+        self.client_positions_by_phone.setdefault(client['Telefon'], position)
+        self.client_positions_by_label.setdefault(client_label(client), position)
+
+    def client_updated(self, old, new, position):
+        """Po edycji klienta zmieniają się tylko klucze telefonu i etykiety - ID i pozycja zostają."""
+        _replace_key(self.client_positions_by_phone, old['Telefon'], new['Telefon'], position)
+        _replace_key(self.client_positions_by_label, client_label(old), client_label(new), position)
+
+    def client_removed(self, client, position):
+        """Usuwa klienta z indeksu; klienci za nim przesuwają się o jedną pozycję."""
+        del self.client_positions[client[CLIENT_ID]]
+        for positions, key in ((self.client_positions_by_phone, client['Telefon']),
+                               (self.client_positions_by_label, client_label(client))):
+            if positions.get(key) == position:
+                del positions[key]
+            _shift_positions(positions, position)
+        _shift_positions(self.client_positions, position)
+
+    # --- Aktywne wypożyczenia: ID -> wypożyczenie, egzemplarz -> wypożyczenie, ID klienta -> wypożyczenia ---
+    def rebuild_rentals(self, rentals):
+        self.rental_by_id = {}
+        self.rental_by_copy = {}
+        self.rentals_by_client = defaultdict(list)
+        for rental in rentals:
+            self.rental_added(rental)
+
+    def rental_added(self, rental):
+        self.rental_by_id[rental[RENTAL_ID]] = rental
+        if rental.get('Egzemplarz') is not None:
+            self.rental_by_copy[rental['Egzemplarz']] = rental
+        self.rentals_by_client[rental.get(CLIENT_ID)].append(rental)
+
+    def rental_replaced(self, old, new):
+        """Podmienia rekord wypożyczenia (np. po zmianie opisu klienta lub gry), zachowując kolejność w indeksie klienta."""
+        self.rental_by_id[new[RENTAL_ID]] = new
+        if self.rental_by_copy.get(old.get('Egzemplarz')) is old:
+            self.rental_by_copy[old['Egzemplarz']] = new
+        client_rentals = self.rentals_by_client.get(old.get(CLIENT_ID), [])
+        self.rentals_by_client[old.get(CLIENT_ID)] = [new if r is old else r for r in client_rentals]
+
+    def rental_removed(self, rental):
+        if self.rental_by_id.get(rental[RENTAL_ID]) is rental:
+            del self.rental_by_id[rental[RENTAL_ID]]
+        if self.rental_by_copy.get(rental.get('Egzemplarz')) is rental:
+            del self.rental_by_copy[rental.get('Egzemplarz')]
+        client_id = rental.get(CLIENT_ID)
+        client_rentals = [r for r in self.rentals_by_client.get(client_id, []) if r is not rental]
+        if client_rentals:
+            self.rentals_by_client[client_id] = client_rentals
+        else:
+            self.rentals_by_client.pop(client_id, None)
+
+
+class HistoryIndex:
+    """Wpisy historii klienta i gry: ID -> pozycje na liście historii (w kolejności zdarzeń)."""
+
+    def __init__(self, entries=()):
+        self.by_client = defaultdict(list)
+        self.by_game = defaultdict(list)
+        for position, entry in enumerate(entries):
+            self.add(entry, position)
+
+    def add(self, entry, position):
+        if entry.get(CLIENT_ID):
+            self.by_client[entry[CLIENT_ID]].append(position)
+        if entry.get(GAME_ID):
+            self.by_game[entry[GAME_ID]].append(position)
+
+
+class LegacyLinks:
+    """Powiązania rekordów sprzed stałych ID odtwarzane z nazw (jednorazowo, przy migracji).
+
+    Gra ustalana jest po egzemplarzu albo tytule, klient po etykiecie 'Imię Nazwisko (Telefon)'.
+    Jeśli się nie da (np. klient został w międzyczasie usunięty), ID pozostaje puste.
+    """
+
+    def __init__(self, games, clients):
+        self.game_by_title = {}
+        self.game_by_copy = {}
+        for game in games:
+            self.game_by_title.setdefault(game['Nazwa Gry'], game[GAME_ID])
+            for copy in game.get(COPIES_KEY, []):
+                self.game_by_copy[copy['ID']] = game[GAME_ID]
+        self.client_by_label = {}
+        for client in clients:
+            self.client_by_label.setdefault(client_label(client), client[CLIENT_ID])
+
+    def linked(self, record):
+        """Zwraca rekord (wypożyczenie lub wpis historii) z uzupełnionymi 'ID gry' i 'ID klienta'."""
+        if GAME_ID in record and CLIENT_ID in record:
+            return record
+        game_id = self.game_by_copy.get(record.get('Egzemplarz')) or self.game_by_title.get(record.get('Tytuł Gry'))
+        client_id = self.client_by_label.get(record.get('Klient'))
+        return dict(record, **{GAME_ID: record.get(GAME_ID, game_id), CLIENT_ID: record.get(CLIENT_ID, client_id)})
@@ -0,0 +1,77 @@
+# Komentarz: Model egzemplarzy. Każda gra (tytuł) ma listę fizycznych egzemplarzy,
+# każdy z własnym ID, które służy też jako kod kreskowy naklejony na pudełko:
+#   {'Nazwa Gry': 'Dobble', 'Dostępna': True,
+#    'Egzemplarze': [{'ID': '000001', 'Dostępny': True}, {'ID': '000002', 'Dostępny': False}]}
+# Pole 'Dostępna' jest utrzymywane jako "co najmniej jeden wolny egzemplarz",
+# dzięki czemu widoki i raporty oparte na nim działają bez zmian.
+
+COPIES_KEY = 'Egzemplarze'
+COPIES_COUNT_KEY = 'Liczba egzemplarzy'
+COPY_ID_WIDTH = 6
+
+
+class CopyIdGenerator:
+    """Kolejne numeryczne ID egzemplarzy (kontynuuje od największego istniejącego)."""
+
+    def __init__(self, games):
+        highest = 0
+        for game in games:
+            for copy in game.get(COPIES_KEY, []):
+                if str(copy['ID']).isdigit():
+                    highest = max(highest, int(copy['ID']))
+        self._next = highest + 1
+
+    def next_id(self):
+        copy_id = str(self._next).zfill(COPY_ID_WIDTH)
+        self._next += 1
+        return copy_id
+
+
+def new_copies(id_generator, count):
+    return [{'ID': id_generator.next_id(), 'Dostępny': True} for _ in range(count)]
+
+
+def with_copies(game, id_generator):
+    """Zwraca rekord gry z listą egzemplarzy.
+
+    Stare rekordy (bez 'Egzemplarze') dostają jeden egzemplarz o stanie z pola 'Dostępna';
+    rekordy z importu mogą podać 'Liczba egzemplarzy'.
+    """
+    if COPIES_KEY in game:
+        return game
+    game = dict(game)
+    count = int(game.pop(COPIES_COUNT_KEY, 1) or 1)
+    copies = new_copies(id_generator, count)
+    if not game.get('Dostępna', True):
+        copies[0]['Dostępny'] = False
+    game[COPIES_KEY] = copies
+    game['Dostępna'] = any(copy['Dostępny'] for copy in copies)
+    return game
+
+
+def with_copy_status(game, copy_id, available):
+    """Zwraca nowy rekord gry ze zmienionym stanem jednego egzemplarza."""
+    copies = [dict(copy, **{'Dostępny': available}) if copy['ID'] == copy_id else copy for copy in game[COPIES_KEY]]
+    return dict(game, **{COPIES_KEY: copies, 'Dostępna': any(copy['Dostępny'] for copy in copies)})
+
+
+def with_copy_count(game, count, id_generator):
+    """Zwraca rekord gry z `count` egzemplarzami. Usuwane są tylko wolne egzemplarze (od końca).
+
+    Zgłasza ValueError, jeśli nie da się zejść do `count` bez usuwania wypożyczonych egzemplarzy.
+    """
+    copies = list(game[COPIES_KEY])
+    if count > len(copies):
+        copies += new_copies(id_generator, count - len(copies))
+    while len(copies) > count:
+        free_positions = [i for i, copy in enumerate(copies) if copy['Dostępny']]
+        if not free_positions:
+            raise ValueError("Nie można usunąć wypożyczonych egzemplarzy.")
+        del copies[free_positions[-1]]
+    return dict(game, **{COPIES_KEY: copies, 'Dostępna': any(copy['Dostępny'] for copy in copies)})
+
+
+def copy_counts(game):
+    """(wolne, wszystkie) egzemplarze gry."""
+    copies = game.get(COPIES_KEY, [])
+    return sum(1 for copy in copies if copy['Dostępny']), len(copies)
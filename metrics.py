@@ -0,0 +1,174 @@
+import io
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+# Komentarz: Lekki pomiar czasu gorących ścieżek (odczyt/zapis magazynu, budowa
+# DataFrame'ów, renderowanie Stylera, cały rerun ekranu). Każdy pomiar ("span")
+# trafia do bufora cyklicznego ostatnich czasów, z którego liczone są percentyle.
+# Koszt pomiaru to dwa odczyty zegara i dopisanie do kolejki - można go zostawić
+# włączonego na stałe. Wyniki pokazuje ukryta strona "Wydajność" oraz eksport
+# w formacie tekstowym Prometheusa. Moduły profilera i serwera HTTP importowane
+# są dopiero przy użyciu, żeby nie wydłużać startu procesu.
+
+RING_SIZE = 500
+QUANTILES = (0.5, 0.9, 0.99)
+PROFILE_HISTORY = 5
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+class SpanStats:
+    """Ostatnie czasy jednego pomiaru (bufor cykliczny) oraz łączna liczba i suma od startu."""
+
+    def __init__(self, size=RING_SIZE):
+        self.recent = deque(maxlen=size)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, seconds):
+        self.recent.append(seconds)
+        self.count += 1
+        self.total += seconds
+
+    def summary(self):
+        values = sorted(self.recent)
+        row = {'Liczba': self.count, 'Suma [s]': self.total}
+        for quantile in QUANTILES:
+            row[f"p{int(quantile * 100)} [ms]"] = percentile(values, quantile) * 1000
+        row['Max [ms]'] = (values[-1] if values else 0.0) * 1000
+        return row
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.spans = {}
+        self.profiles = deque(maxlen=PROFILE_HISTORY)
+
+    def record(self, name, seconds):
+        with self._lock:
+            stats = self.spans.get(name)
+            if stats is None:
+                stats = self.spans[name] = SpanStats()
+            stats.add(seconds)
+
+    def summary(self):
+        """Wiersze tabeli: pomiar, liczba, suma, percentyle i maksimum z ostatnich pomiarów."""
+        with self._lock:
+            return [dict({'Pomiar': name}, **stats.summary()) for name, stats in sorted(self.spans.items())]
+
+    def reset(self):
+        with self._lock:
+            self.spans.clear()
+            self.profiles.clear()
+
+    def prometheus_text(self):
+        """Eksport w formacie tekstowym Prometheusa (typ summary, czasy w sekundach)."""
+        lines = [
+            "# HELP borrow_app_span_seconds Czas wykonania mierzonych fragmentów aplikacji.",
+            "# TYPE borrow_app_span_seconds summary",
+        ]
+        with self._lock:
+            items = [(name, sorted(stats.recent), stats.count, stats.total) for name, stats in sorted(self.spans.items())]
+        for name, values, count, total in items:
+            label = name.replace('\\', '\\\\').replace('"', '\\"')
+            for quantile in QUANTILES:
+                lines.append(f'borrow_app_span_seconds{{span="{label}",quantile="{quantile}"}} {percentile(values, quantile):.6f}')
+            lines.append(f'borrow_app_span_seconds_sum{{span="{label}"}} {total:.6f}')
+            lines.append(f'borrow_app_span_seconds_count{{span="{label}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+    # --- cProfile ---
+    def start_profile(self):
+        """Włącza cProfile dla bieżącego wątku; zwraca profiler albo None, jeśli inny profiler jest już aktywny."""
+        import cProfile
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            return None
+        return profiler
+
+    def finish_profile(self, profiler, label):
+        """Wyłącza profiler i zapamiętuje najdroższe funkcje (ostatnie PROFILE_HISTORY przebiegów)."""
+        import pstats
+        profiler.disable()
+        output = io.StringIO()
+        pstats.Stats(profiler, stream=output).sort_stats('cumulative').print_stats(30)
+        with self._lock:
+            self.profiles.appendleft((time.strftime("%Y-%m-%d %H:%M:%S"), label, output.getvalue()))
+
+    @contextmanager
+    def profile(self, label):
+        """Profiluje blok kodu: `with metrics.profile('import'): ...`."""
+        profiler = self.start_profile()
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                self.finish_profile(profiler, label)
+
+
+metrics = Metrics()
+
+
+@contextmanager
+def span(name):
+    """Mierzy czas bloku: `with span('storage.save.games'): ...`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.record(name, time.perf_counter() - start)
+
+
+def timed(name):
+    """Dekorator mierzący czas wywołania funkcji."""
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# --- Lokalny endpoint /metrics ---
+def _metrics_handler():
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != '/metrics':
+                self.send_error(404)
+                return
+            body = metrics.prometheus_text().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MetricsHandler
+
+
+def start_metrics_server(port=None, host='127.0.0.1'):
+    """Uruchamia w tle serwer /metrics, jeśli ustawiono port (BORROW_APP_METRICS_PORT). Zwraca serwer lub None."""
+    port = port if port is not None else os.environ.get('BORROW_APP_METRICS_PORT')
+    if not port:
+        return None
+    from http.server import ThreadingHTTPServer
+    server = ThreadingHTTPServer((host, int(port)), _metrics_handler())
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    return server
@@ -0,0 +1,175 @@
+import heapq
+import json
+import os
+import sys
+import threading
+from datetime import date
+
+from identifiers import RENTAL_ID
+from services import daily_cost, due_date, warsaw_now, warsaw_today
+
+# Komentarz: Śledzenie przeterminowanych wypożyczeń. Aktywne wypożyczenia trzymane są
+# w kolejce priorytetowej (kopiec) według daty 'Do', więc skan zdejmuje tylko te,
+# którym właśnie minął termin, zamiast przeglądać wszystkie wypożyczenia przy każdym
+# odświeżeniu ekranu. Skan wykonuje wątek w tle; ekran czyta gotowy stan.
+# O nowym przeterminowaniu informowany jest wymienny "odbiorca" powiadomień.
+
+SCAN_INTERVAL_S = 60
+
+
+def rental_key(rental):
+    """Identyfikator wypożyczenia: 'ID wypożyczenia', a dla wpisów bez ID - egzemplarz lub tytuł, klient i data."""
+    return rental.get(RENTAL_ID) or rental.get('Egzemplarz') or (rental.get('Tytuł Gry'), rental.get('Klient'), rental.get('Od'))
+
+
+# --- Powiadomienia ---
+class StdoutSink:
+    """Powiadomienia wypisywane na standardowe wyjście (np. do logu serwera)."""
+
+    def notify(self, message, rental):
+        print(message, file=sys.stdout, flush=True)
+
+
+class FileSink:
+    """Powiadomienia dopisywane do pliku (jeden wpis JSON w linii) - zastępuje SMS/e-mail."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def notify(self, message, rental):
+        entry = {'Data': warsaw_now().strftime("%Y-%m-%d %H:%M:%S"), 'Wiadomość': message, 'Wypożyczenie': rental}
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+
+def sink_from_env(value=None):
+    """Odbiorca powiadomień z ustawienia BORROW_APP_NOTIFY: 'stdout', 'file:ścieżka' lub puste (brak)."""
+    value = os.environ.get('BORROW_APP_NOTIFY', '') if value is None else value
+    if value == 'stdout':
+        return StdoutSink()
+    if value.startswith('file:'):
+        return FileSink(value[len('file:'):])
+    return None
+
+
+class OverdueMonitor:
+    """Przeterminowane wypożyczenia z DataStore wraz z naliczoną opłatą za zwłokę.
+
+    Nowe wypożyczenia trafiają do kopca (data 'Do', kolejność, klucz); zwrócone są
+    pomijane przy zdjęciu z kopca. Opłaty przeliczane są tylko przy zmianie dnia.
+    """
+
+    def __init__(self, data_store, sink=None, today=warsaw_today):
+        self.data_store = data_store
+        self.sink = sink
+        self.today = today
+        self._lock = threading.Lock()
+        self._heap = []
+        self._sequence = 0
+        self._active = {}
+        self._overdue = {}
+        self._rentals_version = None
+        self._day = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def _sync_rentals(self):
+        """Uwzględnia wypożyczenia dodane i zwrócone od ostatniego skanu."""
+        version, rentals = self.data_store.snapshot('rentals')
+        if version == self._rentals_version:
+            return
+        current = {rental_key(rental): rental for rental in rentals}
+        for key in self._active.keys() - current.keys():
+            del self._active[key]
+            self._overdue.pop(key, None)
+        for key, rental in current.items():
+            known = self._active.get(key)
+            if known is rental:
+                continue
+            self._active[key] = rental
+            # Ten sam rekord wczytany ponownie (np. po zmianie w innym procesie)
+            if known == rental:
+                continue
+            if known is not None and due_date(known) == due_date(rental):
+                # Zmienił się tylko opis (nowa nazwa gry lub dane klienta) - bez ponownego powiadomienia
+                if key in self._overdue:
+                    self._overdue[key] = self._overdue_row(rental, due_date(rental), self._day)
+                continue
+            self._overdue.pop(key, None)
+            due = due_date(rental)
+            if due is not None:
+                heapq.heappush(self._heap, (due, self._sequence, key))
+                self._sequence += 1
+        self._rentals_version = version
+
+    def _overdue_row(self, rental, due, today):
+        days_late = (today - due).days
+        return {
+            'Klient': rental.get('Klient'),
+            'Tytuł Gry': rental.get('Tytuł Gry'),
+            'Egzemplarz': rental.get('Egzemplarz'),
+            'Do': due.isoformat(),
+            'Dni zwłoki': days_late,
+            'Opłata za zwłokę': days_late * daily_cost(rental),
+        }
+
+    def scan(self):
+        """Jeden przebieg: zdejmuje z kopca wypożyczenia po terminie i powiadamia o nowych. Zwraca ich liczbę."""
+        today = self.today()
+        newly_overdue = []
+        with self._lock:
+            self._sync_rentals()
+            if today != self._day:
+                # Nowy dzień - rośnie liczba dni zwłoki już przeterminowanych wypożyczeń
+                for key, row in self._overdue.items():
+                    self._overdue[key] = self._overdue_row(self._active[key], date.fromisoformat(row['Do']), today)
+                self._day = today
+            while self._heap and self._heap[0][0] < today:
+                due, _, key = heapq.heappop(self._heap)
+                rental = self._active.get(key)
+                # Wpis po zwróconym (lub zastąpionym) wypożyczeniu
+                if rental is None or key in self._overdue or due_date(rental) != due:
+                    continue
+                self._overdue[key] = self._overdue_row(rental, due, today)
+                newly_overdue.append((rental, self._overdue[key]))
+        if self.sink is not None:
+            for rental, row in newly_overdue:
+                self.sink.notify(
+                    f"Minął termin zwrotu gry '{row['Tytuł Gry']}' ({row['Klient']}), "
+                    f"termin: {row['Do']}, opłata za zwłokę: {row['Opłata za zwłokę']} zł.",
+                    rental
+                )
+        return len(newly_overdue)
+
+    def rows(self):
+        """Przeterminowane wypożyczenia, od najdłużej zalegających."""
+        with self._lock:
+            return sorted(self._overdue.values(), key=lambda row: (-row['Dni zwłoki'], row['Tytuł Gry']))
+
+    def overdue_for(self, rental):
+        """Wiersz przeterminowania dla wypożyczenia lub None."""
+        with self._lock:
+            return self._overdue.get(rental_key(rental))
+
+    # --- Wątek w tle ---
+    def _run(self, interval):
+        while not self._stop.is_set():
+            try:
+                # Zmiany z innych procesów też powinny trafić do kolejki
+                self.data_store.refresh()
+                self.scan()
+            except Exception as e:
+                print(f"Błąd skanu przeterminowanych wypożyczeń: {e}", file=sys.stderr)
+            self._stop.wait(interval)
+
+    def start(self, interval=SCAN_INTERVAL_S):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, args=(interval,), name='overdue-monitor', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
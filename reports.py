@@ -0,0 +1,111 @@
+from collections import defaultdict
+
+from identifiers import GAME_ID
+
+# Komentarz: Bieżące sumy do raportów. DataStore dopisuje do nich każdy nowy wpis
+# historii, więc raport nie musi przeglądać całej historii. Przy starcie (albo po
+# wyczyszczeniu historii) sumy można odbudować z dziennika metodą `rebuild`.
+# Sumy wpisów przeniesionych do archiwum zapisywane są obok archiwum (`to_dict`)
+# i dodawane do bieżących (`merge`), więc raport bez zakresu dat obejmuje całą historię.
+
+RENTAL_EVENT = 'Wypożyczenie'
+RETURN_EVENT = 'Zwrot'
+
+
+def _empty_totals():
+    return {'Wypożyczenia': 0, 'Zwroty': 0, 'Przychód z wypożyczeń': 0, 'Opłaty za zwłokę': 0}
+
+
+class ReportAggregates:
+    def __init__(self):
+        self.daily = defaultdict(_empty_totals)
+        self.monthly = defaultdict(_empty_totals)
+        # Sumy na grę po ID gry (zmiana tytułu nie dzieli statystyk); tytuł z ostatniego wpisu
+        self.per_game = defaultdict(_empty_totals)
+        self.game_titles = {}
+        self.totals = _empty_totals()
+
+    @classmethod
+    def rebuild(cls, entries):
+        """Odbudowuje sumy z pełnej historii (jednorazowo, np. przy starcie)."""
+        aggregates = cls()
+        for entry in entries:
+            aggregates.add(entry)
+        return aggregates
+
+    @classmethod
+    def from_dict(cls, data):
+        aggregates = cls()
+        for name in ('daily', 'monthly', 'per_game'):
+            getattr(aggregates, name).update(data.get(name, {}))
+        aggregates.game_titles.update(data.get('game_titles', {}))
+        aggregates.totals.update(data.get('totals', {}))
+        return aggregates
+
+    def to_dict(self):
+        return {
+            'daily': dict(self.daily), 'monthly': dict(self.monthly), 'per_game': dict(self.per_game),
+            'game_titles': self.game_titles, 'totals': self.totals,
+        }
+
+    def merge(self, other):
+        """Dolicza sumy z `other` (np. z archiwum); tytuły gier z `other` zastępują dotychczasowe."""
+        for name in ('daily', 'monthly', 'per_game'):
+            buckets = getattr(self, name)
+            for key, values in getattr(other, name).items():
+                bucket = buckets[key]
+                for field, value in values.items():
+                    bucket[field] += value
+        self.game_titles.update(other.game_titles)
+        for field, value in other.totals.items():
+            self.totals[field] += value
+        return self
+
+    def add(self, entry):
+        """Dolicza jeden wpis historii - koszt O(1).
+
+        Przychód z wypożyczenia liczony jest w dniu wypożyczenia ('Koszt'), a opłata
+        za zwłokę w dniu zwrotu, dzięki czemu koszt wypożyczenia nie jest liczony dwa razy.
+        """
+        day = str(entry.get('Data', ''))[:10]
+        month = day[:7]
+        title = entry.get('Tytuł Gry', '')
+        # Stare wpisy bez powiązania z grą liczone są po tytule
+        game = entry.get(GAME_ID) or title
+        self.game_titles[game] = title
+        event_type = entry.get('Typ zdarzenia')
+        for bucket in (self.daily[day], self.monthly[month], self.per_game[game], self.totals):
+            if event_type == RENTAL_EVENT:
+                bucket['Wypożyczenia'] += 1
+                bucket['Przychód z wypożyczeń'] += entry.get('Koszt', 0) or 0
+            elif event_type == RETURN_EVENT:
+                bucket['Zwroty'] += 1
+                bucket['Opłaty za zwłokę'] += entry.get('Opłata za zwłokę', 0) or 0
+
+    @staticmethod
+    def _rows(buckets, key_name):
+        rows = []
+        for key in sorted(buckets):
+            row = {key_name: key, **buckets[key]}
+            row['Przychód razem'] = row['Przychód z wypożyczeń'] + row['Opłaty za zwłokę']
+            rows.append(row)
+        return rows
+
+    def daily_rows(self):
+        return self._rows(self.daily, 'Dzień')
+
+    def monthly_rows(self):
+        return self._rows(self.monthly, 'Miesiąc')
+
+    def game_rows(self, current_titles=None):
+        """Wykorzystanie gier: liczba wypożyczeń i przychód na grę, od najczęściej wypożyczanych.
+
+        `current_titles` (ID gry -> tytuł) pozwala pokazać aktualne tytuły gier, których nazwę zmieniono.
+        """
+        current_titles = current_titles or {}
+        rows = []
+        for row in self._rows(self.per_game, 'Tytuł Gry'):
+            game = row['Tytuł Gry']
+            row['Tytuł Gry'] = current_titles.get(game) or self.game_titles.get(game, game)
+            rows.append(row)
+        return sorted(rows, key=lambda row: (-row['Wypożyczenia'], row['Tytuł Gry']))
@@ -0,0 +1,37 @@
+import importlib
+
+# Komentarz: Każdy ekran aplikacji jest osobnym modułem z funkcją `render(app)`.
+# Moduł importowany jest dopiero przy pierwszym wyświetleniu ekranu (potem z
+# sys.modules), więc start procesu i pierwszy rerun nie wczytują kodu - ani
+# zależności, np. pandas - ekranów, których nikt jeszcze nie otworzył.
+# Katalog nie nazywa się 'pages', bo Streamlit traktuje taki katalog jako
+# osobne strony aplikacji wielostronicowej.
+
+SCREENS = {
+    "Wypożyczenie gry": 'rental',
+    "Zwrot gry": 'return_game',
+    "Zaległe zwroty": 'overdue_returns',
+    "Zarządzanie grami": 'games',
+    "Zarządzanie klientami": 'clients',
+    "Historia": 'history',
+    "Raporty": 'report',
+    "Wydajność": 'performance',
+}
+# Ekrany widoczne w menu tylko po dodaniu ?admin=1 do adresu
+ADMIN_SCREENS = ["Wydajność"]
+
+
+class AppContext:
+    """Wspólne dla procesu zasoby, z których korzystają ekrany."""
+
+    def __init__(self, data_store, views, overdue_monitor, sync_session_data):
+        self.data_store = data_store
+        self.views = views
+        self.overdue_monitor = overdue_monitor
+        self.sync_session_data = sync_session_data
+
+
+def render(menu_selection, app):
+    """Wczytuje (przy pierwszym użyciu) i wyświetla wybrany ekran."""
+    module = importlib.import_module(f"{__name__}.{SCREENS[menu_selection]}")
+    module.render(app)
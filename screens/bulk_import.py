@@ -0,0 +1,23 @@
+import streamlit as st
+
+from bulk_io import ImportFormatError, read_table
+
+
+def show_bulk_import(app, key, prepare, existing, add_bulk):
+    """Sekcja masowego importu z pliku: podgląd walidacji i zapis wszystkich rekordów jedną operacją."""
+    uploaded_file = st.file_uploader("Plik CSV lub XLSX", type=['csv', 'xlsx'], key=key)
+    if uploaded_file is None:
+        return
+    try:
+        records, skipped = prepare(read_table(uploaded_file, uploaded_file.name), existing)
+    except ImportFormatError as e:
+        st.error(str(e))
+        return
+    st.write(f"Do dodania: **{len(records)}**, pominięte: **{len(skipped)}**")
+    if skipped:
+        import pandas as pd
+        st.dataframe(pd.DataFrame(skipped, columns=['Wiersz', 'Wartość', 'Powód']), use_container_width=True, hide_index=True)
+    if records and st.button("Importuj", key=f"{key}_button"):
+        added = add_bulk(records)
+        app.sync_session_data()
+        st.success(f"Zaimportowano rekordów: {added}")
@@ -0,0 +1,100 @@
+import streamlit as st
+
+from bulk_io import prepare_clients
+from identifiers import ID_KEYS
+from screens.bulk_import import show_bulk_import
+
+
+def render(app):
+    st.header("Zarządzanie klientami")
+
+    st.subheader("Lista klientów")
+
+    client_search_query = st.text_input("Wyszukaj klienta (imię, nazwisko, telefon)...", key="client_search")
+
+    if app.data_store.clients:
+        clients_to_display = app.views.clients_frame()
+        if client_search_query:
+            positions = [p for p in app.data_store.search_clients(client_search_query) if p < len(clients_to_display)]
+            clients_to_display = clients_to_display.iloc[positions]
+        st.dataframe(clients_to_display, use_container_width=True, hide_index=True)
+    else:
+        st.info("Brak klientów na liście.")
+
+    st.markdown("---")
+    st.subheader("Dodaj nowego klienta")
+    new_client_first_name = st.text_input("Imię klienta")
+    new_client_last_name = st.text_input("Nazwisko klienta")
+    new_client_phone = st.text_input("Numer telefonu")
+
+    if st.button("Dodaj klienta"):
+        if new_client_first_name and new_client_last_name and new_client_phone:
+            app.data_store.add_client({
+                'Imię': new_client_first_name,
+                'Nazwisko': new_client_last_name,
+                'Telefon': new_client_phone
+            })
+            app.sync_session_data()
+            st.success(f"Klient {new_client_first_name} {new_client_last_name} został dodany!")
+        else:
+            st.warning("Wypełnij wszystkie pola, aby dodać klienta.")
+
+    with st.expander("Import klientów z pliku (CSV/XLSX, kolumny 'Imię', 'Nazwisko', 'Telefon')"):
+        show_bulk_import(app, "clients_import", prepare_clients, app.data_store.index.client_positions_by_phone, app.data_store.add_clients_bulk)
+
+    st.markdown("---")
+    st.subheader("Edytuj klienta")
+    if app.data_store.clients:
+        client_labels = app.views.client_labels()
+        selected_client_edit_id = st.selectbox("Wybierz klienta do edycji", list(client_labels), format_func=client_labels.get)
+
+        selected_client_data = app.data_store.find_client(selected_client_edit_id)
+
+        if selected_client_data:
+            new_first_name_edit = st.text_input("Nowe imię", value=selected_client_data['Imię'])
+            new_last_name_edit = st.text_input("Nowe nazwisko", value=selected_client_data['Nazwisko'])
+            new_phone_edit = st.text_input("Nowy numer telefonu", value=selected_client_data['Telefon'])
+
+            if st.button("Zapisz zmiany w kliencie"):
+                if new_first_name_edit and new_last_name_edit and new_phone_edit:
+                    app.data_store.update_client(selected_client_edit_id, {
+                        'Imię': new_first_name_edit,
+                        'Nazwisko': new_last_name_edit,
+                        'Telefon': new_phone_edit
+                    })
+                    app.sync_session_data()
+                    st.success(f"Dane klienta {new_first_name_edit} {new_last_name_edit} zostały zaktualizowane!")
+                else:
+                    st.warning("Wypełnij wszystkie pola, aby edytować klienta.")
+
+            # Historia klienta z indeksu historii (po ID klienta)
+            with st.expander("Historia wypożyczeń klienta"):
+                client_history = app.data_store.client_history(selected_client_edit_id)
+                if client_history:
+                    import pandas as pd
+                    history_df = pd.DataFrame(client_history).drop(columns=list(ID_KEYS), errors='ignore')
+                    st.dataframe(history_df, use_container_width=True, hide_index=True)
+                else:
+                    st.info("Brak wpisów w historii klienta.")
+
+    st.markdown("---")
+    st.subheader("Usuń klienta")
+    if app.data_store.clients:
+        client_labels = app.views.client_labels()
+        selected_client_delete = st.selectbox("Wybierz klienta do usunięcia", list(client_labels), format_func=client_labels.get, key="delete_client_select")
+
+        # Flaga do potwierdzenia usunięcia klienta
+        if 'confirm_delete_client' not in st.session_state:
+            st.session_state.confirm_delete_client = False
+
+        if st.button("Usuń klienta"):
+            st.session_state.confirm_delete_client = True
+
+        if st.session_state.confirm_delete_client:
+            st.warning(f"Czy na pewno chcesz usunąć '{client_labels.get(selected_client_delete)}'? Tej operacji nie można cofnąć.")
+            if st.button("Tak, na pewno chcę usunąć"):
+                app.data_store.delete_client(selected_client_delete)
+                app.sync_session_data()
+                st.success(f"Klient {client_labels.get(selected_client_delete)} został usunięty!")
+                st.session_state.confirm_delete_client = False
+                st.rerun()
@@ -0,0 +1,115 @@
+import numpy as np
+import streamlit as st
+
+from bulk_io import prepare_games
+from data_store import DataConflictError
+from inventory import copy_counts
+from metrics import span
+from screens.bulk_import import show_bulk_import
+from views import STATUS_AVAILABLE
+
+# Liczba wierszy listy gier kolorowanych i wysyłanych do przeglądarki na raz
+GAMES_PAGE_SIZE = 200
+
+
+def render(app):
+    st.header("Zarządzanie grami")
+
+    st.subheader("Lista gier")
+
+    # Dodanie pola wyszukiwania
+    search_query = st.text_input("Wyszukaj po tytule...", key="game_search")
+
+    if app.data_store.games:
+        # Kolumna 'Status' jest wyliczona wcześniej (kategoria) i przechowywana w pamięci podręcznej
+        df_to_display = app.views.games_status_frame()
+
+        # Wyszukiwanie przez indeks (bez polskich znaków, tolerancja literówek), wyniki od najlepszych
+        if search_query:
+            positions = [p for p in app.data_store.search_games(search_query) if p < len(df_to_display)]
+            df_to_display = df_to_display.iloc[positions]
+
+        # Styler jest kosztowny dla każdej komórki - kolorowana jest tylko widoczna strona
+        total_pages = max(1, -(-len(df_to_display) // GAMES_PAGE_SIZE))
+        if total_pages > 1:
+            games_page = st.number_input(f"Strona (z {total_pages})", min_value=1, max_value=total_pages, value=1, key="games_page")
+            df_to_display = df_to_display.iloc[(games_page - 1) * GAMES_PAGE_SIZE:games_page * GAMES_PAGE_SIZE]
+
+        def color_status_text(s):
+            return np.where(s == STATUS_AVAILABLE, 'color: #4CAF50', 'color: #f44336')
+
+        with span("render.games_table"):
+            st.dataframe(
+                df_to_display.style.apply(color_status_text, subset=['Status']),
+                use_container_width=True,
+                hide_index=True
+            )
+
+    else:
+        st.info("Brak gier na liście. Dodaj nową grę, aby rozpocząć.")
+
+    st.markdown("---")
+    st.subheader("Dodaj nową grę")
+    new_game_name = st.text_input("Nazwa nowej gry")
+    new_game_copies = st.number_input("Liczba egzemplarzy", min_value=1, value=1, step=1, key="new_game_copies")
+
+    if st.button("Dodaj grę"):
+        if new_game_name:
+            try:
+                app.data_store.add_game(new_game_name, copies=new_game_copies)
+            except DataConflictError as e:
+                st.warning(str(e))
+            else:
+                app.sync_session_data()
+                st.success(f"Gra '{new_game_name}' została dodana!")
+        else:
+            st.warning("Wpisz nazwę gry, aby ją dodać.")
+
+    with st.expander("Import gier z pliku (CSV/XLSX, kolumny 'Nazwa Gry' i opcjonalnie 'Liczba egzemplarzy')"):
+        show_bulk_import(app, "games_import", prepare_games, app.data_store.index.game_positions, app.data_store.add_games_bulk)
+
+    st.markdown("---")
+    st.subheader("Edytuj grę")
+    games_to_edit = app.views.game_titles()
+    if games_to_edit:
+        selected_game_edit = st.selectbox("Wybierz grę do edycji", games_to_edit)
+        new_game_name_edit = st.text_input("Nowa nazwa", value=selected_game_edit)
+        _, current_copies = copy_counts(app.data_store.find_game(selected_game_edit) or {})
+        new_copies_edit = st.number_input("Liczba egzemplarzy", min_value=1, value=max(1, current_copies), step=1)
+
+        if st.button("Zapisz zmiany"):
+            if new_game_name_edit:
+                try:
+                    if new_copies_edit != current_copies:
+                        app.data_store.set_copy_count(selected_game_edit, new_copies_edit)
+                    if new_game_name_edit != selected_game_edit:
+                        app.data_store.rename_game(selected_game_edit, new_game_name_edit)
+                except DataConflictError as e:
+                    st.error(str(e))
+                else:
+                    app.sync_session_data()
+                    st.success(f"Gra '{selected_game_edit}' zmieniona na '{new_game_name_edit}' ({new_copies_edit} egz.)!")
+            else:
+                st.warning("Nowa nazwa nie może być pusta.")
+
+    st.markdown("---")
+    st.subheader("Usuń grę")
+    games_to_delete = app.views.game_titles()
+    if games_to_delete:
+        selected_game_delete = st.selectbox("Wybierz grę do usunięcia", games_to_delete, key="delete_game_select")
+
+        # Flaga do potwierdzenia usunięcia gry
+        if 'confirm_delete_game' not in st.session_state:
+            st.session_state.confirm_delete_game = False
+
+        if st.button("Usuń grę"):
+            st.session_state.confirm_delete_game = True
+
+        if st.session_state.confirm_delete_game:
+            st.warning(f"Czy na pewno chcesz usunąć '{selected_game_delete}'? Tej operacji nie można cofnąć.")
+            if st.button("Tak, na pewno chcę usunąć"):
+                app.data_store.delete_game(selected_game_delete)
+                app.sync_session_data()
+                st.success(f"Gra '{selected_game_delete}' została usunięta!")
+                st.session_state.confirm_delete_game = False
+                st.rerun()
@@ -0,0 +1,118 @@
+import pandas as pd
+import streamlit as st
+
+from history_archive import DEFAULT_RETENTION_DAYS, retention_cutoff, retention_days_from_env
+from history_view import EVENT_TYPES, filter_history, history_page
+from identifiers import ID_KEYS
+from metrics import span
+
+# Liczba wierszy historii kolorowanych i wysyłanych do przeglądarki na raz
+HISTORY_PAGE_SIZE = 100
+
+
+def render(app):
+    st.header("Historia wypożyczeń i zwrotów")
+
+    archived_months = app.data_store.archived_months()
+
+    if st.session_state.history_data or archived_months:
+        # Filtry są stosowane do listy wpisów, zanim powstanie DataFrame
+        filter_cols = st.columns(5)
+        history_date_from = filter_cols[0].date_input("Od dnia", value=None, key="history_date_from")
+        history_date_to = filter_cols[1].date_input("Do dnia", value=None, key="history_date_to")
+        history_event_type = filter_cols[2].selectbox("Typ zdarzenia", ["Wszystkie"] + EVENT_TYPES, key="history_event_type")
+        history_client = filter_cols[3].text_input("Klient", key="history_client")
+        history_game = filter_cols[4].text_input("Gra", key="history_game")
+
+        # Zakres sięgający przed bieżące okno historii - wpisy dochodzą z plików archiwum z tego zakresu
+        history_source = st.session_state.history_data
+        if app.data_store.reaches_archive(history_date_from, history_date_to):
+            history_source = app.views.history_range(history_date_from, history_date_to)
+        elif archived_months:
+            st.caption(f"Starsze wpisy są w archiwum ({archived_months[0]} - {archived_months[-1]}) - wybierz zakres dat z tego okresu, aby je przeszukać.")
+
+        filtered_history = filter_history(
+            history_source,
+            date_from=history_date_from,
+            date_to=history_date_to,
+            event_type=None if history_event_type == "Wszystkie" else history_event_type,
+            client=history_client,
+            game=history_game
+        )
+
+        total_pages = max(1, -(-len(filtered_history) // HISTORY_PAGE_SIZE))
+        history_page_number = 1
+        if total_pages > 1:
+            history_page_number = st.number_input(f"Strona (z {total_pages})", min_value=1, max_value=total_pages, value=1, key="history_page")
+        page_entries, _ = history_page(filtered_history, history_page_number, HISTORY_PAGE_SIZE)
+        st.caption(f"Znaleziono wpisów: {len(filtered_history)} (najnowsze na początku)")
+
+        # DataFrame, konwersja dat i kolorowanie tylko dla widocznej strony
+        history_df = pd.DataFrame(page_entries).drop(columns=list(ID_KEYS), errors='ignore')
+
+        if 'Data' in history_df.columns:
+            history_df['Data'] = pd.to_datetime(history_df['Data'])
+
+        # Funkcja do kolorowania komórek w kolumnie 'Typ zdarzenia'
+        def color_event_cell(val):
+            if val == 'Wypożyczenie':
+                return 'color: #3182CE; font-weight: bold'
+            elif val == 'Zwrot':
+                return 'color: #ED8936; font-weight: bold'
+            return ''
+
+        # Zmodyfikowane formatowanie, aby nie wyświetlać miejsc po przecinku
+        if history_df.empty:
+            st.info("Brak wpisów spełniających kryteria.")
+        else:
+            with span("render.history_table"):
+                styled_history = history_df.style.map(
+                    color_event_cell,
+                    subset=['Typ zdarzenia']
+                ).format({
+                    'Koszt': '{:.0f}',
+                    'Opłata za zwłokę': '{:.0f}',
+                    'Suma': '{:.0f}'
+                })
+
+                st.dataframe(
+                    styled_history,
+                    use_container_width=True,
+                    hide_index=True
+                )
+    else:
+        st.info("Brak wpisów w historii.")
+
+    st.markdown("---")
+    with st.expander("Archiwizacja starej historii"):
+        st.caption("Wpisy sprzed wybranego dnia trafiają do skompresowanych plików miesięcznych - nie są usuwane, "
+                   "ale nie są też wczytywane przy starcie aplikacji.")
+        archive_before = st.date_input(
+            "Przenieś do archiwum wpisy sprzed dnia",
+            value=retention_cutoff(retention_days_from_env() or DEFAULT_RETENTION_DAYS),
+            key="history_archive_before"
+        )
+        if st.button("Przenieś do archiwum"):
+            archived_count = app.data_store.archive_history(archive_before)
+            app.sync_session_data()
+            st.success(f"Przeniesiono do archiwum wpisów: {archived_count}.")
+
+    if 'confirm_clear' not in st.session_state:
+        st.session_state.confirm_clear = False
+
+    if st.button("Wyczyść historię"):
+        # Ustawienie flagi na True, co spowoduje pojawienie się drugiego przycisku
+        st.session_state.confirm_clear = True
+        st.warning("Czy na pewno chcesz wyczyścić bieżącą historię (archiwum pozostaje bez zmian)? Tej operacji nie można cofnąć.")
+
+    if st.session_state.confirm_clear:
+        if st.button("Tak, wyczyść historię"):
+            if st.session_state.history_data:
+                app.data_store.clear_history()
+                app.sync_session_data()
+                st.success("Historia została pomyślnie wyczyszczona.")
+                st.session_state.confirm_clear = False
+                st.rerun()
+            else:
+                st.info("Historia jest już pusta.")
+                st.session_state.confirm_clear = False
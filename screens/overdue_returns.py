@@ -0,0 +1,17 @@
+import streamlit as st
+
+
+def render(app):
+    st.header("Zaległe zwroty")
+
+    # Stan liczony przyrostowo przez wątek w tle - tu tylko uwzględnienie zmian od ostatniego skanu
+    app.overdue_monitor.scan()
+    overdue_rows = app.overdue_monitor.rows()
+    col1, col2 = st.columns(2)
+    col1.metric("Przeterminowane wypożyczenia", len(overdue_rows))
+    col2.metric("Naliczone opłaty za zwłokę", f"{sum(row['Opłata za zwłokę'] for row in overdue_rows)} zł")
+    if overdue_rows:
+        import pandas as pd
+        st.dataframe(pd.DataFrame(overdue_rows), use_container_width=True, hide_index=True)
+    else:
+        st.info("Brak przeterminowanych wypożyczeń.")
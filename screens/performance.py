@@ -0,0 +1,34 @@
+import pandas as pd
+import streamlit as st
+
+from metrics import metrics
+
+
+def render(app):
+    st.header("Wydajność")
+    st.caption("Czasy ostatnich pomiarów w tym procesie (bufor cykliczny), percentyle w milisekundach.")
+
+    summary = metrics.summary()
+    if summary:
+        st.dataframe(pd.DataFrame(summary), use_container_width=True, hide_index=True)
+    else:
+        st.info("Brak pomiarów.")
+    if st.button("Wyzeruj pomiary"):
+        metrics.reset()
+        st.rerun()
+
+    st.subheader("Profilowanie (cProfile)")
+    # Zwykły klucz sesji (nie klucz widżetu) - ustawienie obowiązuje także na innych ekranach
+    st.session_state.profile_reruns = st.checkbox(
+        "Profiluj kolejne reruny tej sesji", value=st.session_state.get('profile_reruns', False)
+    )
+    for profiled_at, label, report in metrics.profiles:
+        with st.expander(f"{profiled_at} - {label}"):
+            st.code(report)
+
+    st.subheader("Eksport Prometheus")
+    prometheus_text = metrics.prometheus_text()
+    st.download_button("Pobierz metrics.prom", prometheus_text, file_name="metrics.prom")
+    st.caption("Ten sam eksport jest dostępny pod /metrics, jeśli ustawiono BORROW_APP_METRICS_PORT (oraz w API HTTP).")
+    with st.expander("Podgląd"):
+        st.code(prometheus_text)
@@ -0,0 +1,99 @@
+import streamlit as st
+
+import services
+from data_store import DataConflictError
+from inventory import copy_counts
+from services import ServiceError
+
+# Maksymalna liczba pozycji w listach wyboru klienta/gry przy wypożyczeniu
+SEARCH_LIMIT = 50
+
+
+def render(app):
+    st.header("Wypożyczenie gry")
+
+    # Wybór klienta z listy
+    st.subheader("Wybierz klienta")
+
+    # ID klienta -> etykieta; w selectboxie wybierane jest ID, więc klienci o tych samych danych się nie mylą
+    client_labels = app.views.client_labels()
+    client_query = st.text_input("Szukaj klienta (imię, nazwisko, telefon)", key="rental_client_search")
+
+    # Lista wyboru zawiera tylko najlepsze trafienia z indeksu wyszukiwania
+    if client_query:
+        clients_list = [c for c in app.data_store.search_client_ids(client_query, SEARCH_LIMIT) if c in client_labels]
+    else:
+        clients_list = list(client_labels)[:SEARCH_LIMIT]
+
+    if not client_labels:
+        st.warning("Brak zarejestrowanych klientów. Dodaj klienta w sekcji 'Zarządzanie klientami'.")
+        selected_client_id = None
+    elif not clients_list:
+        st.warning("Nie znaleziono klienta pasującego do wyszukiwania.")
+        selected_client_id = None
+    else:
+        if len(client_labels) > len(clients_list):
+            st.caption(f"Pokazano {len(clients_list)} z {len(client_labels)} klientów - wpisz fragment danych, aby zawęzić listę.")
+        selected_client_id = st.selectbox("Wybierz klienta", clients_list, format_func=client_labels.get)
+
+    # Wybór gry
+    st.subheader("Wybór gry")
+    all_available_games = app.views.available_games()
+    game_query = st.text_input("Szukaj gry", key="rental_game_search")
+
+    if game_query:
+        available_games = app.data_store.search_available_games(game_query, SEARCH_LIMIT)
+    else:
+        available_games = all_available_games[:SEARCH_LIMIT]
+
+    if not all_available_games:
+        st.warning("Brak dostępnych gier do wypożyczenia.")
+        selected_game = None
+    elif not available_games:
+        st.warning("Nie znaleziono dostępnej gry pasującej do wyszukiwania.")
+        selected_game = None
+    else:
+        if len(all_available_games) > len(available_games):
+            st.caption(f"Pokazano {len(available_games)} z {len(all_available_games)} dostępnych gier - wpisz fragment tytułu, aby zawęzić listę.")
+        selected_game = st.selectbox("Wybierz grę", available_games)
+        # Liczba wolnych egzemplarzy odczytywana z indeksu, bez przeglądania listy gier
+        if selected_game:
+            _, total_copies = copy_counts(app.data_store.find_game(selected_game) or {})
+            st.caption(f"Wolne egzemplarze: {app.data_store.available_count(selected_game)}/{total_copies}")
+
+    # Daty wypożyczenia
+    if selected_game and selected_client_id:
+        st.subheader("Okres wypożyczenia")
+        start_date = st.date_input("Data wypożyczenia (od)")
+        end_date = st.date_input("Data zwrotu (do)")
+
+        # Obliczenie kosztów
+        if start_date and end_date:
+            rental_days = services.rental_days(start_date, end_date)
+
+            st.subheader("Koszty wypożyczenia")
+            st.write(f"Wyliczony okres wypożyczenia: **{rental_days} dni**")
+
+            edited_days = st.number_input("Edytuj liczbę dni", min_value=1, value=rental_days, key="new_rental_days")
+            cost_per_day = st.number_input("Cena za dzień", min_value=1, value=5, key="new_rental_cost")
+
+            total_cost = edited_days * cost_per_day
+
+            st.markdown(f"**Całkowity koszt: {total_cost} zł**")
+
+        if st.button("Zarejestruj wypożyczenie"):
+            if not all([selected_client_id, selected_game, start_date, end_date]):
+                st.error("Wybierz klienta, grę i daty!")
+            else:
+                # Wypożyczenie, status gry i historia zapisywane razem; gra mogła zostać
+                # w międzyczasie wypożyczona w innym terminalu
+                try:
+                    rental = services.rent_game(
+                        app.data_store, selected_client_id, selected_game, start_date, end_date,
+                        cost_per_day=cost_per_day, days=edited_days
+                    )
+                except (DataConflictError, ServiceError) as e:
+                    st.error(str(e))
+                else:
+                    app.sync_session_data()
+                    st.success(f"Wypożyczenie zarejestrowane pomyślnie! Egzemplarz: {rental['Egzemplarz']}")
@@ -0,0 +1,36 @@
+import streamlit as st
+
+
+def render(app):
+    st.header("Raporty przychodów i wykorzystania gier")
+
+    # Bez zakresu dat raport korzysta z bieżących sum (razem z sumami archiwum) - koszt nie zależy
+    # od długości historii. Zakres dat liczony jest z wpisów zakresu, także z archiwum.
+    range_cols = st.columns(2)
+    report_date_from = range_cols[0].date_input("Od dnia", value=None, key="report_date_from")
+    report_date_to = range_cols[1].date_input("Do dnia", value=None, key="report_date_to")
+    if report_date_from or report_date_to:
+        reports = app.views.range_reports(report_date_from, report_date_to)
+    else:
+        reports = app.views.reports()
+    totals = reports['totals']
+
+    if not totals['Wypożyczenia'] and not totals['Zwroty']:
+        st.info("Brak danych do raportu.")
+    else:
+        metric_cols = st.columns(4)
+        metric_cols[0].metric("Przychód razem", f"{totals['Przychód z wypożyczeń'] + totals['Opłaty za zwłokę']:.0f} zł")
+        metric_cols[1].metric("Opłaty za zwłokę", f"{totals['Opłaty za zwłokę']:.0f} zł")
+        metric_cols[2].metric("Wypożyczenia", totals['Wypożyczenia'])
+        metric_cols[3].metric("Zwroty", totals['Zwroty'])
+
+        st.subheader("Przychód dzienny (ostatnie 30 dni)")
+        daily_df = reports['daily'].tail(30)
+        st.bar_chart(daily_df.set_index('Dzień')['Przychód razem'])
+        st.dataframe(daily_df.iloc[::-1], use_container_width=True, hide_index=True)
+
+        st.subheader("Przychód miesięczny")
+        st.dataframe(reports['monthly'].iloc[::-1], use_container_width=True, hide_index=True)
+
+        st.subheader("Wykorzystanie gier")
+        st.dataframe(reports['games'], use_container_width=True, hide_index=True)
@@ -0,0 +1,77 @@
+from datetime import date, datetime
+
+import streamlit as st
+
+import services
+from data_store import DataConflictError
+from identifiers import ID_KEYS
+
+
+def render(app):
+    st.header("Zwrot gry")
+
+    # Tylko aktywne wypożyczenia niedostępnych gier - wyszukiwane przez indeks
+    rented_games = app.data_store.rented_games()
+
+    if rented_games:
+        st.subheader("Aktualne wypożyczenia")
+
+        # Tworzenie DataFrame dla lepszego widoku (pandas dopiero tutaj - pusty ekran go nie potrzebuje)
+        import pandas as pd
+        df_rented_games = pd.DataFrame(rented_games).drop(columns=list(ID_KEYS), errors='ignore')
+        df_rented_games['Od'] = pd.to_datetime(df_rented_games['Od']).dt.date
+        df_rented_games['Do'] = pd.to_datetime(df_rented_games['Do']).dt.date
+        st.dataframe(df_rented_games)
+
+        st.markdown("---")
+        st.subheader("Zaznacz grę do zwrotu")
+
+        rental_to_return_idx = st.selectbox(
+            "Wybierz wypożyczenie:",
+            options=range(len(rented_games)),
+            format_func=lambda idx: f"{rented_games[idx]['Tytuł Gry']} [{rented_games[idx].get('Egzemplarz')}] - {rented_games[idx]['Klient']}"
+        )
+
+        rental_to_return = rented_games[rental_to_return_idx]
+        game_title = rental_to_return['Tytuł Gry']
+        declared_end_date = datetime.strptime(rental_to_return['Do'], '%Y-%m-%d').date()
+        daily_cost = services.daily_cost(rental_to_return)
+        overdue_row = app.overdue_monitor.overdue_for(rental_to_return)
+        if overdue_row:
+            st.warning(f"Termin zwrotu minął {overdue_row['Do']} - dni zwłoki na dziś: {overdue_row['Dni zwłoki']}, opłata: {overdue_row['Opłata za zwłokę']} zł.")
+
+        st.markdown("---")
+        st.subheader("Rozliczenie zwłoki")
+
+        late_fee_method = st.radio(
+            "Jak chcesz określić zwłokę?",
+            ["Ręcznie wpisz dni", "Wybierz datę z kalendarza"],
+            key="late_fee_method"
+        )
+
+        days_late = 0
+
+        if late_fee_method == "Ręcznie wpisz dni":
+            days_late = st.number_input("Ile dni klient oddał grę po czasie?", min_value=0, value=0, step=1, key="manual_days_late")
+        else:
+            return_date = st.date_input("Wybierz datę zwrotu", value=date.today(), key="calendar_return_date")
+            days_late = services.days_late(declared_end_date, return_date)
+
+        late_fee, original_cost, final_cost = services.return_summary(rental_to_return, days_late)
+
+        st.markdown(f"**Opłata za zwłokę: {late_fee} zł** (dni zwłoki: {days_late}, cena za dzień: {daily_cost} zł)")
+
+        st.markdown(f"**Całkowity koszt dla klienta: {final_cost} zł** (wypożyczenie: {original_cost} zł + zwłoka: {late_fee} zł)")
+
+        if st.button("Zwróć zaznaczoną grę"):
+            # Usunięcie wypożyczenia, zmiana statusu gry i historia zapisywane razem
+            try:
+                services.return_rental(app.data_store, rental_to_return, late_days=days_late)
+            except DataConflictError as e:
+                st.error(str(e))
+            else:
+                app.sync_session_data()
+                # Zmieniony komunikat - wyświetla tylko opłatę za zwłokę
+                st.success(f"Gra '{game_title}' została zwrócona pomyślnie! Kwota do dopłaty: {late_fee} zł.")
+    else:
+        st.info("Obecnie nie ma żadnych wypożyczonych gier.")
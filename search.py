@@ -0,0 +1,116 @@
+import heapq
+import unicodedata
+from collections import Counter, defaultdict
+
+# Komentarz: Indeks wyszukiwania dla tytułów gier i klientów. Tekst jest normalizowany
+# (małe litery, bez polskich znaków diakrytycznych), a wyszukiwanie korzysta z indeksu
+# prefiksów słów (krótkie zapytania) i trygramów (dłuższe zapytania i literówki),
+# więc nie trzeba przeglądać całej listy przy każdym naciśnięciu klawisza.
+
+# 'ł' nie rozkłada się w NFKD na literę + znak diakrytyczny
+_EXTRA_FOLDS = str.maketrans({'ł': 'l'})
+
+SHORT_PREFIX = 2
+FUZZY_THRESHOLD = 0.35
+
+
+def normalize(text):
+    """'Żółć  Łódź' -> 'zolc lodz'."""
+    text = str(text).casefold().translate(_EXTRA_FOLDS)
+    text = ''.join(ch for ch in unicodedata.normalize('NFKD', text) if not unicodedata.combining(ch))
+    return ' '.join(text.split())
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SearchIndex:
+    def __init__(self, texts):
+        """`texts` - lista tekstów; wyniki wyszukiwania to pozycje na tej liście."""
+        self.texts = []
+        self.prefixes = defaultdict(set)
+        self.trigrams = defaultdict(set)
+        for text in texts:
+            self.add(text)
+
+    def _keys(self, text):
+        keys = {('p', word[:length]) for word in text.split() for length in range(1, SHORT_PREFIX + 1)}
+        keys.update(('t', trigram) for trigram in _trigrams(f" {text} "))
+        return keys
+
+    def _index(self, position, text, remove=False):
+        for kind, key in self._keys(text):
+            postings = (self.prefixes if kind == 'p' else self.trigrams)[key]
+            if remove:
+                postings.discard(position)
+            else:
+                postings.add(position)
+
+    def add(self, text):
+        """Dodaje tekst na końcu listy (nowa gra lub klient)."""
+        self.texts.append(normalize(text))
+        self._index(len(self.texts) - 1, self.texts[-1])
+
+    def update(self, position, text):
+        """Podmienia tekst na danej pozycji (zmiana nazwy gry, edycja klienta)."""
+        self._index(position, self.texts[position], remove=True)
+        self.texts[position] = normalize(text)
+        self._index(position, self.texts[position])
+
+    def _candidates(self, token):
+        if len(token) <= SHORT_PREFIX:
+            return self.prefixes.get(token, set())
+        sets = [self.trigrams.get(trigram, set()) for trigram in _trigrams(token)]
+        sets.sort(key=len)
+        result = set(sets[0])
+        for other in sets[1:]:
+            result &= other
+            if not result:
+                break
+        # Trygramy mogą dać fałszywe trafienia - sprawdzenie podciągu
+        return {position for position in result if token in self.texts[position]}
+
+    def _rank(self, position, tokens):
+        """Najpierw trafienia od początku słowa, potem wcześniejsze wystąpienie, potem krótsze teksty."""
+        text = self.texts[position]
+        word_starts = sum(1 for token in tokens if text.startswith(token) or f" {token}" in text)
+        return (-word_starts, text.find(tokens[0]), len(text), position)
+
+    def _fuzzy(self, query, limit):
+        query_trigrams = _trigrams(f" {query} ")
+        if not query_trigrams:
+            return []
+        counts = Counter()
+        for trigram in query_trigrams:
+            counts.update(self.trigrams.get(trigram, ()))
+        scored = [
+            (shared / len(query_trigrams), position)
+            for position, shared in counts.items()
+            if shared / len(query_trigrams) >= FUZZY_THRESHOLD
+        ]
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [position for _, position in scored[:limit]]
+
+    def search(self, query, limit=20):
+        """Zwraca pozycje najlepiej pasujących tekstów (co najwyżej `limit`, None = wszystkie).
+
+        Każde słowo zapytania musi wystąpić w tekście; jeśli nic nie pasuje dokładnie,
+        używane jest dopasowanie przybliżone po trygramach (np. przy literówkach).
+        """
+        query = normalize(query)
+        if not query:
+            return []
+        tokens = query.split()
+        matches = None
+        for token in sorted(tokens, key=len, reverse=True):
+            found = self._candidates(token)
+            matches = found if matches is None else matches & found
+            if not matches:
+                break
+        if matches:
+            rank = lambda position: self._rank(position, tokens)
+            if limit is None:
+                return sorted(matches, key=rank)
+            return heapq.nsmallest(limit, matches, key=rank)
+        return self._fuzzy(query, len(self.texts) if limit is None else limit)
@@ -0,0 +1,166 @@
+from datetime import date, datetime
+from functools import lru_cache
+
+from data_store import DataConflictError
+from identifiers import CLIENT_ID, RENTAL_ID
+from indexes import client_label
+from reports import RENTAL_EVENT, RETURN_EVENT
+
+# Komentarz: Operacje na wypożyczeniach wspólne dla interfejsu Streamlit i API HTTP:
+# wyliczanie kosztu, rejestracja wypożyczenia, zwrot z opłatą za zwłokę oraz
+# budowa wpisów historii. Ekrany i API tylko zbierają dane wejściowe i pokazują wynik.
+# Strefa czasowa (pytz) i polski format daty (babel) wczytywane są przy pierwszym
+# użyciu i zapamiętywane na cały proces.
+
+DEFAULT_DAILY_COST = 5
+
+
+class ServiceError(ValueError):
+    """Niepoprawne dane wejściowe (np. brak wymaganego pola, zła data)."""
+
+
+class NotFoundError(ServiceError):
+    """Wskazany klient, gra lub egzemplarz nie istnieje."""
+
+
+@lru_cache(maxsize=None)
+def warsaw_timezone():
+    import pytz
+    return pytz.timezone('Europe/Warsaw')
+
+
+def warsaw_now():
+    return datetime.now(warsaw_timezone())
+
+
+def warsaw_today():
+    return warsaw_now().date()
+
+
+@lru_cache(maxsize=8)
+def polish_date(day):
+    """Pełna data po polsku, np. 'piątek, 17 października 2026' (formatowana raz na dzień)."""
+    from babel.dates import format_date
+    return format_date(day, format='full', locale='pl_PL')
+
+
+def _timestamp():
+    return warsaw_now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+# --- Koszty ---
+def rental_days(start_date, end_date):
+    """Liczba dni wypożyczenia (co najmniej 1)."""
+    return max(1, (end_date - start_date).days)
+
+
+def days_late(declared_end_date, return_date):
+    """Dni zwłoki przy zwrocie w dniu `return_date` (0, jeśli w terminie)."""
+    return max(0, (return_date - declared_end_date).days)
+
+
+def daily_cost(rental):
+    return rental.get('Cena za dzień', DEFAULT_DAILY_COST)
+
+
+def due_date(rental):
+    """Zadeklarowana data zwrotu wypożyczenia lub None przy niepoprawnym wpisie."""
+    try:
+        return date.fromisoformat(str(rental.get('Do', ''))[:10])
+    except ValueError:
+        return None
+
+
+# --- Wypożyczenie ---
+def rent_game(data_store, client_id, title, start_date, end_date, cost_per_day=DEFAULT_DAILY_COST, days=None, copy_id=None):
+    """Rejestruje wypożyczenie klientowi o podanym ID i zwraca zapisany rekord (z ID i polem 'Egzemplarz').
+
+    `days` pozwala nadpisać wyliczoną liczbę dni (jak pole "Edytuj liczbę dni").
+    Zgłasza ServiceError przy niepoprawnych danych i DataConflictError, gdy nie ma wolnego egzemplarza.
+    """
+    client_record = data_store.find_client(client_id)
+    if client_record is None:
+        raise NotFoundError(f"Nieznany klient: {client_id}")
+    client = client_label(client_record)
+    if end_date < start_date:
+        raise ServiceError("Data zwrotu nie może być wcześniejsza niż data wypożyczenia.")
+    if cost_per_day < 1 or (days is not None and days < 1):
+        raise ServiceError("Liczba dni i cena za dzień muszą być dodatnie.")
+    total_cost = (days or rental_days(start_date, end_date)) * cost_per_day
+    rental = {
+        CLIENT_ID: client_id,
+        'Klient': client,
+        'Tytuł Gry': title,
+        'Od': start_date.isoformat(),
+        'Do': end_date.isoformat(),
+        'Koszt': total_cost,
+        'Cena za dzień': cost_per_day
+    }
+    history_entry = {
+        'Data': _timestamp(),
+        'Typ zdarzenia': RENTAL_EVENT,
+        'Tytuł Gry': title,
+        'Klient': client,
+        'Koszt': total_cost,
+        'Opłata za zwłokę': 0,  # W momencie wypożyczenia opłata za zwłokę to 0
+        'Suma': total_cost
+    }
+    return data_store.register_rental(rental, history_entry, copy_id=copy_id)
+
+
+def rent_copy(data_store, client_id, copy_id, start_date, end_date, **options):
+    """Wypożyczenie po kodzie kreskowym egzemplarza."""
+    game = data_store.game_for_copy(copy_id)
+    if game is None:
+        raise NotFoundError(f"Nieznany egzemplarz: {copy_id}")
+    return rent_game(data_store, client_id, game['Nazwa Gry'], start_date, end_date, copy_id=copy_id, **options)
+
+
+# --- Zwrot ---
+def return_summary(rental, late_days):
+    """Rozliczenie zwrotu: (opłata za zwłokę, koszt wypożyczenia, suma)."""
+    late_fee = late_days * daily_cost(rental)
+    original_cost = rental.get('Koszt', 0)
+    return late_fee, original_cost, original_cost + late_fee
+
+
+def return_rental(data_store, rental, return_date=None, late_days=None):
+    """Rejestruje zwrot. Dni zwłoki podane wprost albo liczone od daty zwrotu (domyślnie dziś).
+
+    Zwraca słownik z rozliczeniem; zgłasza DataConflictError, jeśli wypożyczenie zostało już zwrócone.
+    """
+    if late_days is None:
+        declared_end_date = due_date(rental)
+        if declared_end_date is None:
+            raise ServiceError(f"Niepoprawna data zwrotu wypożyczenia: {rental.get('Do')}")
+        late_days = days_late(declared_end_date, return_date or warsaw_today())
+    late_fee, original_cost, final_cost = return_summary(rental, late_days)
+    history_entry = {
+        'Data': _timestamp(),
+        'Typ zdarzenia': RETURN_EVENT,
+        'Tytuł Gry': rental['Tytuł Gry'],
+        'Klient': rental['Klient'],
+        'Koszt': original_cost,
+        'Opłata za zwłokę': late_fee,
+        'Suma': final_cost
+    }
+    data_store.return_rental(rental, history_entry)
+    return {
+        RENTAL_ID: rental.get(RENTAL_ID),
+        'Tytuł Gry': rental['Tytuł Gry'],
+        'Klient': rental['Klient'],
+        'Egzemplarz': rental.get('Egzemplarz'),
+        'Dni zwłoki': late_days,
+        'Opłata za zwłokę': late_fee,
+        'Suma': final_cost,
+    }
+
+
+def return_copy(data_store, copy_id, return_date=None, late_days=None):
+    """Zwrot po kodzie kreskowym egzemplarza."""
+    rental = data_store.index.rental_by_copy.get(copy_id)
+    if rental is None:
+        if copy_id in data_store.index.copy_games:
+            raise DataConflictError(f"Egzemplarz {copy_id} nie jest wypożyczony.")
+        raise NotFoundError(f"Nieznany egzemplarz: {copy_id}")
+    return return_rental(data_store, rental, return_date, late_days)
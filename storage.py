@@ -0,0 +1,520 @@
+import itertools
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from history_archive import HistoryArchive
+from history_log import HistoryLog
+from identifiers import CLIENT_ID, GAME_ID, RENTAL_ID
+from metrics import span
+
+# Komentarz: Warstwa przechowywania danych. Aplikacja korzysta wyłącznie z metod
+# load/save/save_changes/append_history/read_history/clear_history/archive_history/transaction,
+# dzięki czemu backend (pliki JSON lub SQLite) można wymienić bez zmian w ekranach.
+# `save_changes` przekazuje zarówno nową listę, jak i zmienione rekordy: pliki JSON
+# zapisywane są w całości, a SQLite zmienia tylko wiersze tych rekordów (po ID).
+#
+# Z tych samych danych może korzystać kilka procesów (np. kilka instancji aplikacji
+# albo import z wiersza poleceń). Zapisy odbywają się pod blokadą międzyprocesową,
+# a każda zmiana kolekcji podbija jej znacznik wersji (`read_versions`), po którym
+# DataStore w innym procesie pozna, że musi wczytać kolekcję ponownie.
+
+COLLECTIONS = ('games', 'clients', 'rentals')
+
+# Znacznik w bazie SQLite: import z plików JSON zakończony (zapisywany w transakcji importu)
+JSON_IMPORTED = 'json_imported'
+
+# Ścieżki do plików z danymi
+DATA_FILES = {
+    'games': 'games.json',
+    'clients': 'clients.json',
+    'rentals': 'rentals.json',
+}
+HISTORY_FILE = 'history.json'  # Stary format (tablica JSON) - używany tylko do migracji
+HISTORY_LOG_DIR = 'history_log'
+# Archiwum starej historii (pliki miesięczne .jsonl.gz) - wspólne dla obu backendów
+HISTORY_ARCHIVE_DIR = 'history_archive'
+DATABASE_FILE = 'borrow_app.db'
+VERSIONS_FILE = 'versions.json'
+LOCK_FILE = 'borrow_app.lock'
+
+# Znacznik podbijany przy czyszczeniu historii (odróżnia wyczyszczenie od dopisania)
+HISTORY_CLEARED = 'history_cleared'
+
+
+class FileLock:
+    """Blokada między procesami oparta na pliku (flock, w Windows msvcrt.locking).
+
+    W obrębie procesu działa jak RLock - ten sam wątek może wejść wielokrotnie.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def _lock_file(self, f):
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            return
+        f.seek(0)
+        while True:
+            try:
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                # LK_LOCK poddaje się po ok. 10 s - czekamy dalej
+                continue
+
+    def _unlock_file(self, f):
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            try:
+                f = open(self.path, 'a+')
+                try:
+                    self._lock_file(f)
+                except BaseException:
+                    f.close()
+                    raise
+            except BaseException:
+                self._thread_lock.release()
+                raise
+            self._file = f
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        self._depth -= 1
+        if self._depth == 0:
+            try:
+                self._unlock_file(self._file)
+            finally:
+                self._file.close()
+                self._file = None
+        self._thread_lock.release()
+
+
+def _write_json_atomic(path, data, **dump_options):
+    """Zapisuje JSON do pliku tymczasowego obok i podmienia plik docelowy (os.replace).
+
+    Awaria w trakcie zapisu zostawia poprzednią, kompletną wersję pliku.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, **dump_options)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class JsonStorage:
+    """Dotychczasowy magazyn: jeden plik JSON na kolekcję i dziennik historii.
+
+    Pliki zapisywane są atomowo, a zapisy z różnych procesów serializuje blokada
+    na pliku `lock_file`. Znaczniki wersji kolekcji trzymane są w `versions_file`.
+    """
+
+    def __init__(self, files, history_log_dir, on_error=None, versions_file=VERSIONS_FILE, lock_file=LOCK_FILE,
+                 archive_dir=HISTORY_ARCHIVE_DIR):
+        self.files = files
+        self.history_log = HistoryLog(history_log_dir)
+        self.history_archive = HistoryArchive(archive_dir)
+        self.on_error = on_error
+        self.versions_file = versions_file
+        self._file_lock = FileLock(lock_file)
+
+    def load(self, name, default_data):
+        """Ładuje dane z pliku JSON. Jeśli plik nie istnieje lub jest uszkodzony, tworzy go z domyślnymi danymi.
+
+        Uszkodzony plik nie jest nadpisywany - zostaje zachowany jako *.corrupt.
+        """
+        file_path = self.files[name]
+        if os.path.exists(file_path):
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f, span(f"storage.load.{name}"):
+                    return json.load(f)
+            except json.JSONDecodeError:
+                with self.transaction():
+                    if os.path.exists(file_path):
+                        os.replace(file_path, file_path + '.corrupt')
+                if self.on_error:
+                    self.on_error(f"Błąd odczytu pliku {file_path}. Plik jest uszkodzony (kopia: {file_path}.corrupt). Zostanie utworzony nowy, pusty plik.")
+        self.save(name, default_data)
+        return default_data
+
+    def save(self, name, data_list):
+        """Zapisuje dane do pliku JSON (atomowo, pod blokadą międzyprocesową)."""
+        with self.transaction():
+            with span(f"storage.save.{name}"):
+                _write_json_atomic(self.files[name], data_list, indent=4)
+            self._bump_versions(name)
+
+    def save_changes(self, name, data_list, changed=(), removed=()):
+        """Zapisuje zmianę kolekcji. Plik JSON nie pozwala zmienić pojedynczych rekordów - zapisywana jest cała lista."""
+        self.save(name, data_list)
+
+    def read_versions(self):
+        """Znaczniki wersji kolekcji zapisane na dysku (kolekcja -> numer)."""
+        try:
+            with open(self.versions_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _bump_versions(self, *names):
+        versions = self.read_versions()
+        for name in names:
+            versions[name] = versions.get(name, 0) + 1
+        _write_json_atomic(self.versions_file, versions)
+
+    def append_history(self, entry):
+        with self.transaction():
+            with span("storage.append_history"):
+                self.history_log.append(entry)
+            self._bump_versions('history')
+
+    def read_history(self):
+        with span("storage.read_history"):
+            return self.history_log.read_all()
+
+    def migrate_history_file(self, json_path):
+        """Jednorazowe przeniesienie starego history.json do dziennika - pod blokadą, więc raz przy kilku procesach."""
+        with self.transaction():
+            return self.history_log.migrate_from_json(json_path)
+
+    def read_history_since(self, count):
+        """Wpisy historii od pozycji `count` (dopisane np. przez inny proces)."""
+        return list(itertools.islice(self.history_log.iter_entries(), count, None))
+
+    def iter_records(self, name):
+        """Rekordy kolekcji po kolei (historia czytana strumieniowo: najpierw archiwum, potem dziennik)."""
+        if name == 'history':
+            return itertools.chain(self.history_archive.iter_entries(), self.history_log.iter_entries())
+        return iter(self.load(name, []))
+
+    def clear_history(self):
+        with self.transaction():
+            self.history_log.clear()
+            self._bump_versions('history', HISTORY_CLEARED)
+
+    def rewrite_history(self, entries):
+        """Zastępuje całą historię (jednorazowe migracje formatu wpisów)."""
+        with self.transaction():
+            self.history_log.rewrite(entries)
+            self._bump_versions('history', HISTORY_CLEARED)
+
+    def archive_history(self, count):
+        """Przenosi `count` najstarszych wpisów historii do archiwum (najpierw zapis archiwum, potem dziennika)."""
+        with self.transaction(), span("storage.archive_history"):
+            entries = self.history_log.read_all()
+            self.history_archive.add(entries[:count])
+            self.history_log.rewrite(entries[count:])
+            self._bump_versions('history', HISTORY_CLEARED)
+
+    @contextmanager
+    def transaction(self):
+        """Wyłączny dostęp do plików (blokada międzyprocesowa). Pliki JSON nie obsługują
+        wycofania zmian - zapisy wykonują się po kolei, ale żaden inny proces nie wejdzie pomiędzy."""
+        with self._file_lock:
+            yield self
+
+
+class SqliteStorage:
+    """Magazyn SQLite (tryb WAL). Każdy rekord jest przechowywany jako JSON w kolumnie
+    `data`, a jego ID w osobnej, zindeksowanej kolumnie (zapis pojedynczych wierszy)."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS games (
+            id INTEGER PRIMARY KEY,
+            record_id TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS clients (
+            id INTEGER PRIMARY KEY,
+            record_id TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS rentals (
+            id INTEGER PRIMARY KEY,
+            record_id TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS history (
+            id INTEGER PRIMARY KEY,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS versions (
+            collection TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+    """
+
+    # Indeksy tworzone po uzupełnieniu kolumn (starsze bazy nie mają kolumny z ID). Wiersze
+    # zapisywane i usuwane są po ID rekordu; wyszukiwanie po tytule, telefonie czy datach
+    # obsługują indeksy w pamięci (indexes.py).
+    INDEXES = """
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_games_record_id ON games(record_id);
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_clients_record_id ON clients(record_id);
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_rentals_record_id ON rentals(record_id);
+    """
+
+    # Kolumny wyliczane z rekordu: kolumna -> klucz w słowniku
+    INDEXED_COLUMNS = {
+        'games': {'record_id': GAME_ID},
+        'clients': {'record_id': CLIENT_ID},
+        'rentals': {'record_id': RENTAL_ID},
+        'history': {},
+    }
+
+    def __init__(self, db_path, archive_dir=HISTORY_ARCHIVE_DIR):
+        self.db_path = db_path
+        self.history_archive = HistoryArchive(archive_dir)
+        # Streamlit wykonuje sesje w różnych wątkach - jedno połączenie chronione blokadą
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(self.SCHEMA)
+        self._add_missing_columns()
+        self._conn.executescript(self.INDEXES)
+
+    def _add_missing_columns(self):
+        """Dodaje do istniejącej bazy kolumny indeksowane, których nie było w starszej wersji schematu,
+        i wypełnia je wartościami z zapisanych rekordów."""
+        for table, columns in self.INDEXED_COLUMNS.items():
+            existing = {row[1] for row in self._conn.execute(f'PRAGMA table_info({table})')}
+            missing = [column for column in columns if column not in existing]
+            if not missing:
+                continue
+            with self.transaction():
+                for column in missing:
+                    try:
+                        self._conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} TEXT')
+                    except sqlite3.OperationalError as e:
+                        # Kilka procesów może otwierać starą bazę naraz - kolumnę dodał już inny
+                        if 'duplicate column' not in str(e):
+                            raise
+                rows = self._conn.execute(f'SELECT id, data FROM {table}').fetchall()
+                assignments = ', '.join(f'{column} = ?' for column in missing)
+                self._conn.executemany(
+                    f'UPDATE {table} SET {assignments} WHERE id = ?',
+                    [[json.loads(data).get(columns[column]) for column in missing] + [row_id] for row_id, data in rows]
+                )
+
+    @contextmanager
+    def transaction(self):
+        """Grupuje kilka zapisów (np. wypożyczenie + status gry + historia) w jedną transakcję."""
+        with self._lock:
+            if self._depth == 0:
+                self._conn.execute('BEGIN IMMEDIATE')
+            self._depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._conn.execute('ROLLBACK')
+                raise
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._conn.execute('COMMIT')
+
+    def _row_values(self, table, record):
+        columns = self.INDEXED_COLUMNS[table]
+        values = [record.get(key) for key in columns.values()]
+        values.append(json.dumps(record, ensure_ascii=False))
+        return values
+
+    def _insert_sql(self, table):
+        columns = list(self.INDEXED_COLUMNS[table]) + ['data']
+        placeholders = ', '.join('?' for _ in columns)
+        return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+
+    def _bump_version(self, *names):
+        self._conn.executemany(
+            "INSERT INTO versions (collection, version) VALUES (?, 1) "
+            "ON CONFLICT(collection) DO UPDATE SET version = version + 1",
+            [(name,) for name in names]
+        )
+
+    def read_versions(self):
+        """Znaczniki wersji kolekcji (kolekcja -> numer), zmieniane razem z danymi w jednej transakcji."""
+        with self._lock:
+            return dict(self._conn.execute('SELECT collection, version FROM versions').fetchall())
+
+    def load(self, name, default_data):
+        with span(f"storage.load.{name}"):
+            with self._lock:
+                rows = self._conn.execute(f'SELECT data FROM {name} ORDER BY id').fetchall()
+            if not rows:
+                return default_data
+            return [json.loads(row[0]) for row in rows]
+
+    def save(self, name, data_list):
+        """Zastępuje zawartość kolekcji w ramach jednej transakcji."""
+        with self.transaction(), span(f"storage.save.{name}"):
+            self._conn.execute(f'DELETE FROM {name}')
+            self._conn.executemany(
+                self._insert_sql(name),
+                [self._row_values(name, record) for record in data_list]
+            )
+            self._bump_version(name)
+
+    def save_changes(self, name, data_list, changed=(), removed=()):
+        """Zapisuje tylko zmienione wiersze: `changed` - rekordy dodane lub zmienione, `removed` - ID usuniętych.
+
+        Zmieniony rekord zachowuje swój wiersz (i miejsce na liście), nowy trafia na koniec.
+        Koszt zależy od liczby zmienionych rekordów, a nie od wielkości kolekcji.
+        """
+        columns = list(self.INDEXED_COLUMNS[name])
+        updates = ', '.join(f'{column} = excluded.{column}' for column in columns[1:] + ['data'])
+        with self.transaction(), span(f"storage.save_changes.{name}"):
+            if removed:
+                self._conn.executemany(f'DELETE FROM {name} WHERE record_id = ?', [(record_id,) for record_id in removed])
+            if changed:
+                self._conn.executemany(
+                    self._insert_sql(name) + f' ON CONFLICT(record_id) DO UPDATE SET {updates}',
+                    [self._row_values(name, record) for record in changed]
+                )
+            self._bump_version(name)
+
+    def append_history(self, entry):
+        with self.transaction(), span("storage.append_history"):
+            self._conn.execute(self._insert_sql('history'), self._row_values('history', entry))
+            self._bump_version('history')
+
+    def read_history(self):
+        with span("storage.read_history"):
+            with self._lock:
+                rows = self._conn.execute('SELECT data FROM history ORDER BY id').fetchall()
+            return [json.loads(row[0]) for row in rows]
+
+    def read_history_since(self, count):
+        """Wpisy historii od pozycji `count` (dopisane np. przez inny proces)."""
+        with self._lock:
+            rows = self._conn.execute('SELECT data FROM history ORDER BY id LIMIT -1 OFFSET ?', (count,)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def clear_history(self):
+        with self.transaction():
+            self._conn.execute('DELETE FROM history')
+            self._bump_version('history', HISTORY_CLEARED)
+
+    def json_imported(self):
+        """Czy import z plików JSON został zakończony (przerwany import jest wycofywany razem ze znacznikiem)."""
+        with self._lock:
+            return self._conn.execute('SELECT 1 FROM meta WHERE key = ?', (JSON_IMPORTED,)).fetchone() is not None
+
+    def mark_json_imported(self):
+        with self.transaction():
+            self._conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (JSON_IMPORTED, '1'))
+
+    def rewrite_history(self, entries):
+        """Zastępuje całą historię (jednorazowe migracje formatu wpisów)."""
+        with self.transaction():
+            self._conn.execute('DELETE FROM history')
+            self._conn.executemany(self._insert_sql('history'), [self._row_values('history', entry) for entry in entries])
+            self._bump_version('history', HISTORY_CLEARED)
+
+    def archive_history(self, count):
+        """Przenosi `count` najstarszych wpisów historii do archiwum; usunięcie z bazy w tej samej transakcji."""
+        with self.transaction(), span("storage.archive_history"):
+            rows = self._conn.execute('SELECT id, data FROM history ORDER BY id LIMIT ?', (count,)).fetchall()
+            if not rows:
+                return
+            self.history_archive.add(json.loads(row[1]) for row in rows)
+            self._conn.execute('DELETE FROM history WHERE id <= ?', (rows[-1][0],))
+            self._bump_version('history', HISTORY_CLEARED)
+
+    def iter_records(self, name, batch_size=1000):
+        """Rekordy kolekcji po kolei, pobierane z bazy partiami przez osobne połączenie (historia - razem z archiwum)."""
+        if name == 'history':
+            yield from self.history_archive.iter_entries()
+        conn = sqlite3.connect(self.db_path)
+        try:
+            cursor = conn.execute(f'SELECT data FROM {name} ORDER BY id')
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield json.loads(row[0])
+        finally:
+            conn.close()
+
+
+def import_json_files(sqlite_storage, json_storage, history_file=None):
+    """Importuje dane z plików JSON (i dziennika historii) do bazy SQLite w jednej transakcji.
+
+    Zwraca słownik z liczbą zaimportowanych rekordów dla każdej kolekcji.
+    """
+    if history_file:
+        json_storage.migrate_history_file(history_file)
+    counts = {}
+    with sqlite_storage.transaction():
+        for name in COLLECTIONS:
+            records = [record for record in json_storage.load(name, []) if record]
+            sqlite_storage.save(name, records)
+            counts[name] = len(records)
+        history = json_storage.read_history()
+        sqlite_storage.rewrite_history(history)
+        counts['history'] = len(history)
+        sqlite_storage.mark_json_imported()
+    return counts
+
+
+def open_storage(backend, on_error=None):
+    """Tworzy magazyn danych ('sqlite' lub 'json'). Dopóki import do SQLite się nie zakończy, jest ponawiany przy starcie."""
+    json_storage = JsonStorage(DATA_FILES, HISTORY_LOG_DIR, on_error=on_error)
+    json_storage.migrate_history_file(HISTORY_FILE)
+    if backend != 'sqlite':
+        return json_storage
+    sqlite_storage = SqliteStorage(DATABASE_FILE)
+    # Sprawdzenie i import w jednej transakcji: przerwany import nie zostawia pustej bazy
+    # uznanej za gotową, a dwa procesy startujące naraz nie importują danych dwa razy
+    with sqlite_storage.transaction():
+        if not sqlite_storage.json_imported():
+            import_json_files(sqlite_storage, json_storage)
+    return sqlite_storage
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Import danych z plików JSON do bazy SQLite.")
+    parser.add_argument('command', choices=['import'])
+    parser.add_argument('--db', default=DATABASE_FILE, help="Ścieżka do pliku bazy SQLite")
+    args = parser.parse_args()
+
+    source = JsonStorage(DATA_FILES, HISTORY_LOG_DIR)
+    counts = import_json_files(SqliteStorage(args.db), source, history_file=HISTORY_FILE)
+    print(', '.join(f"{name}: {count}" for name, count in counts.items()))
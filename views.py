@@ -0,0 +1,121 @@
+import threading
+
+from history_view import filter_history
+from identifiers import CLIENT_ID, ID_KEYS
+from indexes import client_label
+from inventory import copy_counts
+from metrics import span
+
+STATUS_AVAILABLE = "Dostępna"
+STATUS_RENTED = "Wypożyczona"
+
+# Komentarz: Widoki pochodne (DataFrame'y, listy do selectboxów) są liczone raz
+# na wersję danych i współdzielone przez wszystkie sesje. Zwykły rerun Streamlita
+# (kliknięcie, wpisanie tekstu) nie przebudowuje ich, dopóki dane się nie zmienią.
+# pandas importowany jest dopiero przy budowie pierwszego DataFrame'u - listy do
+# selectboxów liczone są bez niego, więc ekrany bez tabel nie płacą za import.
+
+
+class DerivedViews:
+    def __init__(self, data_store):
+        self.data_store = data_store
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def _get(self, name, collection, builder, depends_on=(), query=None):
+        """Zwraca widok z pamięci podręcznej albo buduje go, jeśli wersja kolekcji (lub `depends_on`) się zmieniła.
+
+        Widoki z parametrem (`query`, np. zakres dat) pamiętane są tylko dla ostatniego zapytania.
+        """
+        version, data = self.data_store.snapshot(collection)
+        if depends_on:
+            version = (version, *(self.data_store.snapshot(other)[0] for other in depends_on))
+        if query is not None:
+            version = (version, query)
+        cached = self._cache.get(name)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        with span(f"views.{name}"):
+            value = builder(data)
+        with self._lock:
+            self._cache[name] = (version, value)
+        return value
+
+    def games_frame(self):
+        import pandas as pd
+        return self._get('games_frame', 'games', pd.DataFrame)
+
+    def clients_frame(self):
+        import pandas as pd
+        # ID klienta jest kluczem technicznym - w tabeli pokazywane są tylko dane klienta
+        return self._get('clients_frame', 'clients', lambda clients: pd.DataFrame(clients).drop(columns=list(ID_KEYS), errors='ignore'))
+
+    def games_status_frame(self):
+        """Tabela 'Nazwa Gry' + 'Status' z kategorią statusu wyliczoną wektorowo."""
+        import numpy as np
+        import pandas as pd
+
+        def build(data):
+            games = self.games_frame()
+            if games.empty:
+                return pd.DataFrame(columns=['Nazwa Gry', 'Status', 'Wolne egzemplarze'])
+            available = self._availability(games)
+            status = pd.Categorical(
+                np.where(available, STATUS_AVAILABLE, STATUS_RENTED),
+                categories=[STATUS_AVAILABLE, STATUS_RENTED]
+            )
+            counts = [copy_counts(game) for game in data]
+            copies = [f"{free}/{total}" for free, total in counts]
+            return pd.DataFrame({'Nazwa Gry': games['Nazwa Gry'].to_numpy(), 'Status': status, 'Wolne egzemplarze': copies})
+        return self._get('games_status_frame', 'games', build)
+
+    def available_games(self):
+        """Tytuły gier, które można wypożyczyć."""
+        def build(games):
+            return [game['Nazwa Gry'] for game in games if game.get('Dostępna', True)]
+        return self._get('available_games', 'games', build)
+
+    def client_labels(self):
+        """ID klienta -> etykieta 'Imię Nazwisko (Telefon)' (w kolejności listy) do wyboru klienta."""
+        return self._get('client_labels', 'clients', lambda clients: {client[CLIENT_ID]: client_label(client) for client in clients})
+
+    @staticmethod
+    def _report_frames(rows):
+        import pandas as pd
+        return {
+            'daily': pd.DataFrame(rows['daily']),
+            'monthly': pd.DataFrame(rows['monthly']),
+            'games': pd.DataFrame(rows['games']),
+            'totals': rows['totals'],
+        }
+
+    def reports(self):
+        """Tabele raportów zbudowane z bieżących sum - bez przeglądania historii."""
+        # Sumy gier są liczone po ID gry, a tytuły brane z bieżącej listy gier
+        return self._get('reports', 'history', lambda _: self._report_frames(self.data_store.report_rows()), depends_on=('games',))
+
+    def history_range(self, date_from, date_to):
+        """Wpisy historii z zakresu dat; gdy zakres sięga przed bieżące okno - razem z wpisami z archiwum."""
+        def build(history):
+            entries = filter_history(history, date_from=date_from, date_to=date_to)
+            if self.data_store.reaches_archive(date_from, date_to):
+                entries = list(self.data_store.archived_history(date_from, date_to)) + entries
+            return entries
+        return self._get('history_range', 'history', build, query=(date_from, date_to))
+
+    def range_reports(self, date_from, date_to):
+        """Tabele raportów dla zakresu dat, liczone z wpisów zakresu (także z archiwum)."""
+        def build(_):
+            return self._report_frames(self.data_store.report_rows(self.history_range(date_from, date_to)))
+        return self._get('range_reports', 'history', build, depends_on=('games',), query=(date_from, date_to))
+
+    @staticmethod
+    def _availability(games):
+        """Maska dostępności; brak pola 'Dostępna' oznacza grę dostępną."""
+        import numpy as np
+        if 'Dostępna' not in games.columns:
+            return np.ones(len(games), dtype=bool)
+        return games['Dostępna'].fillna(True).astype(bool).to_numpy()
+
+    def game_titles(self):
+        return self._get('game_titles', 'games', lambda games: [game['Nazwa Gry'] for game in games])